@@ -1,3 +1,4 @@
+import os
 import time
 
 import selenium.common.exceptions as selenium_exceptions
@@ -9,116 +10,201 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from utils import (check_element_text_is_empty,
-                   convert_strdate_to_numbpad_keys,
-                   today_date_in_keys)
-import yaml
-
-from webdrivers_installer import install_web_driver
+from utils import check_element_text_is_empty, today_date
+from batch_fill import (batch_fill,
+                        read_values,
+                        ALREADY_FILLED,
+                        FILLED,
+                        MISSING,
+                        UNCHANGED,
+                        UNSUPPORTED)
+from browser_profiles import (apply_chrome_profile,
+                              apply_firefox_profile,
+                              apply_request_blocking,
+                              get_browser_profile)
+from checkpoint_store import CheckpointStore
+from date_entry import date_to_numpad_keys, set_date
+from failure_artifacts import capture_failure, shared_writer
+from dropdown_options import DropdownOptionIndex, SELECT_OPTION_SCRIPT, is_selected_option, match_option
+from locators import LocatorRegistry, find_first_element
+from page_plans import TODAY_VALUE, compile_page_plan
+from page_readiness import PageReadiness
+from panel_expansion import expand_panels
+from page_snapshot import (PageSnapshot,
+                           MY_INFORMATION_PAGE,
+                           MY_EXPERIENCE_PAGE,
+                           SELF_IDENTIFY_PAGE,
+                           REVIEW_PAGE)
+from page_state_machine import PageStateMachine
+from resume_model import load_resume as load_resume_model
+from resume_upload import start_upload, wait_for_upload
+from session_store import SessionStore, get_tenant_host
+from step_scheduler import StepScheduler, after, depend_on, element_present
+from tracing import Tracer
+from webdriver_manager.core.os_manager import ChromeType
+from webdrivers_installer import get_web_driver_path
+
+
+# Workday 提交成功后显示的确认信息
+APPLICATION_SUBMITTED_XPATH = ('//*[contains(text(),"Application Submitted") '
+                               'or contains(text(),"Thank you for applying")]')
 
 
 class PageStep:
-    def __init__(self, action, params, options=None):
+    def __init__(self, action, params, options=None, name=None, depends_on=None):
         self.action = action
         self.params = params
         if options is None:
             self.options = {}
         else:
             self.options = options
+        # other steps can wait for this one with after(name)
+        self.name = name
+        # after(step name) / element_present(xpath), see step_scheduler
+        self.depends_on = list(depends_on or [])
 
 
 class WorkdayAutofill:
-    def __init__(self, application_link, resume_path):
+    def __init__(self, application_link, resume_path, headless=False, interactive=True, driver=None,
+                 browser_profile=None, resume=None):
         self.application_link = application_link
         self.resume_path = resume_path
-        self.driver = WorkdayAutofill.create_webdriver("chrome")
-        self.resume_data = self.load_resume()
+        # without interaction unknown pages stop the application instead of asking the user
+        self.interactive = interactive
+        # an existing driver can be given, e.g. a session attached to a tab of a shared browser
+        self.browser_profile, _ = get_browser_profile(browser_profile, headless)
+        self.driver = driver or WorkdayAutofill.create_webdriver("chrome", headless=headless,
+                                                                 profile=self.browser_profile)
+        # a resume already parsed by the caller (e.g. shared by the jobs of a batch manifest)
+        self.resume = resume or self.load_resume()
         self.current_url = None
         self.ELEMENT_WAITING_TIMEOUT = 2
+        self.tracer = Tracer()
+        self.tracer.install(self.driver)
+        self.readiness = PageReadiness(self.driver, tracer=self.tracer)
+        self.sessions = SessionStore()
+        self.tenant = get_tenant_host(self.application_link)
+        self.locators = LocatorRegistry()
+        self.dropdown_options = DropdownOptionIndex()
+        self.checkpoints = CheckpointStore()
+        # 失败现场 (截图, DOM, 最近的步骤) 由后台线程写入
+        self.failures = shared_writer()
+        # progress of this application, loaded by start_application
+        self.checkpoint = None
+        # snapshot of the page the instructions are being built for
+        self.snapshot = None
 
     @classmethod
-    def create_webdriver(cls, browser_name):
+    def create_webdriver(cls, browser_name, headless=False, profile=None):
+        """profile: name of a launch profile in browser_profiles.BROWSER_PROFILES, see get_browser_profile"""
+        _, browser_profile = get_browser_profile(profile, headless)
+        if browser_name.lower() == "firefox":
+            options = webdriver.FirefoxOptions()
+            if headless:
+                options.add_argument("-headless")
+            apply_firefox_profile(options, browser_profile)
+        elif browser_name.lower() == "chrome":
+            options = webdriver.ChromeOptions()
+            if headless:
+                options.add_argument("--headless=new")
+                options.add_argument("--window-size=1920,1080")
+            apply_chrome_profile(options, browser_profile)
+        else:
+            raise RuntimeError(f"{browser_name} is not supported !")
         try:
             if browser_name.lower() == "firefox":
-                driver = webdriver.Firefox()
-            elif browser_name.lower() == "chrome":
-                from webdriver_manager.chrome import ChromeDriverManager
-                from selenium.webdriver.chrome.service import Service
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service)
+                driver = webdriver.Firefox(options=options)
             else:
-                raise RuntimeError(f"{browser_name} is not supported !")
+                # cached driver path, the driver manager only runs when chrome was upgraded
+                service = ChromeService(executable_path=get_web_driver_path(
+                    requested_browser=browser_name, chrome_type=ChromeType.GOOGLE))
+                driver = webdriver.Chrome(service=service, options=options)
         except selenium_exceptions.WebDriverException:
-            # trying to install the web driver if not installed in the system
+            # trying to install the web driver if not installed in the system,
+            # recorded under the same chrome type so the next runs find it in the cache
+            web_driver_path = get_web_driver_path(requested_browser=browser_name, chrome_type=ChromeType.GOOGLE,
+                                                  refresh=True)
             if browser_name.lower() == "firefox":
-                web_driver_path = install_web_driver(requested_browser=browser_name)
-                driver = webdriver.Firefox(service=FirefoxService(executable_path=web_driver_path))
-            elif browser_name.lower() == "chrome":
-                web_driver_path = install_web_driver(requested_browser=browser_name)
-                driver = webdriver.Chrome(service=ChromeService(executable_path=web_driver_path))
+                driver = webdriver.Firefox(service=FirefoxService(executable_path=web_driver_path),
+                                           options=options)
             else:
-                raise RuntimeError(f"{browser_name} is not supported !")
-        else:
-            return driver
+                driver = webdriver.Chrome(service=ChromeService(executable_path=web_driver_path),
+                                          options=options)
+        apply_request_blocking(driver, browser_profile)
+        return driver
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except selenium_exceptions.WebDriverException:
+            pass
+        # 浏览器已经关闭, 等待后台线程写完失败现场
+        self.failures.flush()
 
     def load_resume(self):
-        with open(self.resume_path) as resume:
-            try:
-                return yaml.safe_load(resume)
-            except yaml.YAMLError as e:
-                print(e)
+        # parsed and validated once, schema errors are raised here
+        return load_resume_model(self.resume_path)
 
     def load_work_experiences(self):
-        try:
-            works = self.resume_data["my-experience"]["work-experiences"]
-            return [work_dict[f"work{idx}"] for idx, work_dict in enumerate(works, start=1)]
-        except KeyError:
-            raise ValueError("Something went wrong while parsing your resume.yml WORK-EXPERIENCE"
-                             f" -> please review the works order !")
+        return self.resume.works
 
     def load_education_experiences(self):
-        try:
-            educations = self.resume_data["my-experience"]["education-experiences"]
-            return [education_dict[f"education{idx}"] for idx, education_dict in enumerate(educations, start=1)]
-        except KeyError:
-            raise ValueError("Something went wrong while parsing your resume.yml EDUCATION-EXPERIENCES"
-                             f" -> please review the educations order !")
+        return self.resume.educations
 
     def load_languages(self):
-        try:
-            languages = self.resume_data["my-experience"]["languages"]
-            return [language_dict[f"language{idx}"] for idx, language_dict in enumerate(languages, start=1)]
-        except KeyError:
-            raise ValueError("Something went wrong while parsing your resume.yml LANGUAGES"
-                             f" -> please review the languages order !")
+        return self.resume.languages
 
     def load_additional_information(self):
-        try:
-            return self.resume_data["additional-information"]
-        except KeyError:
-            raise ValueError("Something went wrong while parsing your resume.yml LANGUAGES"
-                             f" -> please review the additional-information key !")
+        return dict(self.resume.additional_information)
 
     def load_self_identify(self):
-        try:
-            return self.resume_data["self-identify"]
-        except KeyError:
-            raise ValueError("Something went wrong while parsing your resume.yml LANGUAGES"
-                             f" -> please review the self-identify key !")
+        return self.resume.self_identify
+
+    def step_locators(self, element_xpath, kwoptions):
+        """候选定位器: 字段注册的 data-automation-id 选择器优先, 步骤的 XPath 作为后备"""
+        if kwoptions.get("field"):
+            return self.locators.candidates(kwoptions["field"], self.tenant,
+                                            fallback_xpath=element_xpath, idx=kwoptions.get("idx"))
+        return [(By.XPATH, element_xpath, "fallback")]
+
+    def find_step_element(self, element_xpath, kwoptions, timeout=None):
+        """
+        一次调用中按顺序尝试所有候选定位器, 并记录当前租户上成功的定位器
+        没有 timeout 时立即查找 (NoSuchElementException), 否则等待 (TimeoutException)
+        """
+        candidates = self.step_locators(element_xpath, kwoptions)
+        if timeout is None:
+            element, candidate = find_first_element(self.driver, candidates)
+        else:
+            def locate(driver):
+                try:
+                    return find_first_element(driver, candidates)
+                except selenium_exceptions.NoSuchElementException:
+                    return False
+            started_at = time.perf_counter()
+            succeeded = False
+            try:
+                element, candidate = WebDriverWait(self.driver, timeout).until(locate)
+                succeeded = True
+            finally:
+                self.tracer.record_wait("element", "locate", time.perf_counter() - started_at, succeeded)
+        self.tracer.note_locator(candidate[1])
+        if kwoptions.get("field"):
+            self.locators.record_winner(kwoptions["field"], self.tenant, candidate)
+        return element
 
     def locate_and_fill(self, element_xpath, input_data, kwoptions):
         if not input_data:
             return False
         if not kwoptions.get("required"):
             try:
-                element = self.driver.find_element(By.XPATH, element_xpath)
+                element = self.find_step_element(element_xpath, kwoptions)
             except selenium_exceptions.NoSuchElementException:
                 # skip if element is not in the page
                 return False
         else:
             try:
-                element = WebDriverWait(self.driver, self.ELEMENT_WAITING_TIMEOUT).until(
-                    EC.presence_of_element_located((By.XPATH, element_xpath)))
+                element = self.find_step_element(element_xpath, kwoptions, self.ELEMENT_WAITING_TIMEOUT)
             except (selenium_exceptions.NoSuchElementException, selenium_exceptions.TimeoutException):
                 raise RuntimeError(
                     f"Cannot locate element '{element_xpath}' in the following page : {self.driver.current_url}"
@@ -127,9 +213,12 @@ class WorkdayAutofill:
             # quit if the element is already filled
             return False
         # fill date MM/YYYY
-        if "YYYY" in element_xpath:
-            date_keys = convert_strdate_to_numbpad_keys(input_data)
-            element.send_keys(date_keys)
+        if kwoptions.get("date") or "YYYY" in element_xpath:
+            # 一次调用设置所有日期分段并确认页面显示的日期, 没有确认时再逐键输入
+            widget, verified, _ = set_date(self.driver, element, input_data)
+            if not verified:
+                print(f"[WARNING] date widget ({widget}) did not take {input_data}, typing it")
+                element.send_keys(date_to_numpad_keys(input_data))
         else:
             self.driver.execute_script(
                 'arguments[0].value="";', element)
@@ -141,20 +230,24 @@ class WorkdayAutofill:
     def locate_dropdown_and_fill(self, element_xpath, input_data, kwoptions):
         if not kwoptions.get("required"):
             try:
-                element = self.driver.find_element(By.XPATH, element_xpath)
+                element = self.find_step_element(element_xpath, kwoptions)
             except selenium_exceptions.NoSuchElementException:
                 # skip if element is not in the page
                 return False
         else:
             try:
-                element = WebDriverWait(self.driver, self.ELEMENT_WAITING_TIMEOUT).until(
-                    EC.presence_of_element_located((By.XPATH, element_xpath)))
+                element = self.find_step_element(element_xpath, kwoptions, self.ELEMENT_WAITING_TIMEOUT)
             except (selenium_exceptions.NoSuchElementException, selenium_exceptions.TimeoutException):
                 raise RuntimeError(
                     f"Cannot locate element '{element_xpath}' in the following page : {self.driver.current_url}"
                 )
 
-        self.driver.execute_script("arguments[0].click();", element)
+        if self.select_indexed_option(element, element_xpath, input_data, kwoptions):
+            return True
+
+        # the option was not offered (e.g. a long list that only renders what is typed): search for it
+        self.driver.execute_script("if (arguments[0].getAttribute('aria-expanded') !== 'true') arguments[0].click();",
+                                   element)
         element.send_keys(input_data)
         if kwoptions.get("value_is_pattern"):
             select_xpath = f'//div[contains(text(),"{input_data}")]'
@@ -172,10 +265,30 @@ class WorkdayAutofill:
             self.driver.execute_script("arguments[0].click();", choice)
             return True
 
+    def select_indexed_option(self, element, element_xpath, input_data, kwoptions):
+        """
+        Open the listbox and click the option matching input_data, using the option labels known for this
+        tenant and field. One round trip when the labels are known, two when they have to be read first.
+        :return: False when no offered option matches
+        """
+        field = kwoptions.get("field") or element_xpath
+        pattern = kwoptions.get("value_is_pattern", False)
+        timeout_ms = int(self.ELEMENT_WAITING_TIMEOUT * 1000)
+        label = match_option(input_data, self.dropdown_options.options(self.tenant, field), pattern)
+        result = self.driver.execute_async_script(SELECT_OPTION_SCRIPT, element, label, timeout_ms)
+        if result["clicked"]:
+            return True
+        # unknown or stale labels: match against what the page offers right now
+        self.dropdown_options.record(self.tenant, field, result["options"])
+        fresh_label = match_option(input_data, result["options"], pattern)
+        if fresh_label is None or fresh_label == label:
+            return False
+        result = self.driver.execute_async_script(SELECT_OPTION_SCRIPT, element, fresh_label, timeout_ms)
+        return result["clicked"]
+
     def locate_and_click(self, button_xpath, kwoptions):
         try:
-            clickable_element = WebDriverWait(self.driver, self.ELEMENT_WAITING_TIMEOUT).until(
-                EC.presence_of_element_located((By.XPATH, button_xpath)))
+            clickable_element = self.find_step_element(button_xpath, kwoptions, self.ELEMENT_WAITING_TIMEOUT)
         except (selenium_exceptions.NoSuchElementException, selenium_exceptions.TimeoutException):
             if not kwoptions.get("required"):
                 return False
@@ -214,42 +327,107 @@ class WorkdayAutofill:
             action.drag_and_drop(element1, element2).perform()
             return True
 
-    def execute_instructions(self, instructions):
-        idx = 0 # 从第一个元素开始
-        while idx < len(instructions): # 当索引还在列表范围内时循环
-            page_step = instructions[idx] # 获取当前指令
-            print(page_step.params)
-            status = False # Default status
-
-            # --- 执行指令逻辑 (和之前一样) ---
-            if page_step.action == "LOCATE_AND_FILL":
-                status = self.locate_and_fill(*page_step.params, page_step.options)
-            elif page_step.action == "LOCATE_AND_CLICK":
-                status = self.locate_and_click(*page_step.params, page_step.options)
-            elif page_step.action == "LOCATE_DROPDOWN_AND_FILL":
-                status = self.locate_dropdown_and_fill(*page_step.params, page_step.options)
-            elif page_step.action == "LOCATE_AND_UPLOAD":
-                status = self.locate_and_upload(*page_step.params, page_step.options)
-            elif page_step.action == "LOCATE_AND_DRAG_DROP":
-                status = self.locate_and_drag_drop(*page_step.params, page_step.options)
-            else:
-                raise RuntimeError(f"Unknown instruction: {page_step.action} \n"
-                                   f" called with params : {page_step.params} \n "
-                                   f"and options : {page_step.options} ")
-            # --- 指令执行结束 ---
-
-            # 如果指令执行成功
-            if status:
-                instructions.pop(idx)
-                # 不增加idx，因为下一个元素已经移动到了当前idx的位置
-            else:
-                # 如果指令执行失败，或者没有执行成功，则移动到下一个索引
-                idx += 1
-
-    def create_account(self):
-        """尝试创建一个新账号"""
-        print("[INFO] 尝试创建账号")
+    @staticmethod
+    def is_batchable_fill(page_step):
+        """纯文本输入可以合并到一次注入脚本中，日期和需要回车的输入仍然走按键路径"""
+        if page_step.action != "LOCATE_AND_FILL":
+            return False
+        element_xpath, input_data = page_step.params[0], page_step.params[1]
+        return (isinstance(input_data, (str, int, float))
+                and not isinstance(input_data, bool)
+                and "YYYY" not in element_xpath
+                and not page_step.options.get("date")
+                and not page_step.options.get("press_enter"))
+
+    def batch_locate_and_fill(self, page_steps):
+        """
+        在一次 WebDriver 调用中填写多个文本框, 已经是简历中的值的文本框不会被修改
+        返回 (每个步骤的状态, 跳过的步骤数)
+        """
+        statuses = [False] * len(page_steps)
+        unchanged = 0
+        pending = [(idx, page_step) for idx, page_step in enumerate(page_steps) if page_step.params[1]]
+        candidates = [self.step_locators(page_step.params[0], page_step.options) for _, page_step in pending]
+        results = batch_fill(self.driver, [
+            ([(by, value) for by, value, _ in step_candidates],
+             page_step.params[1],
+             page_step.options.get("only_if_empty"))
+            for step_candidates, (_, page_step) in zip(candidates, pending)
+        ]) if pending else []
+        for (idx, page_step), step_candidates, (result, winner) in zip(pending, candidates, results):
+            if winner >= 0 and page_step.options.get("field"):
+                self.locators.record_winner(page_step.options["field"], self.tenant, step_candidates[winner])
+            if result == FILLED:
+                statuses[idx] = True
+            elif result in (UNCHANGED, ALREADY_FILLED):
+                statuses[idx] = True
+                unchanged += 1
+            elif result == UNSUPPORTED or (result == MISSING and page_step.options.get("required")):
+                # file inputs, non text elements or required elements still loading
+                statuses[idx] = self.locate_and_fill(*page_step.params, page_step.options)
+        return statuses, unchanged
+
+    @staticmethod
+    def is_diffable_dropdown(page_step):
+        return page_step.action == "LOCATE_DROPDOWN_AND_FILL" and bool(page_step.params[1])
+
+    def find_unchanged_dropdowns(self, page_steps):
+        """
+        一次调用读取所有下拉框按钮上显示的文本, 返回已经选择了简历中的值的步骤
+        """
+        dropdowns = [page_step for page_step in page_steps if self.is_diffable_dropdown(page_step)]
+        if not dropdowns:
+            return []
+        candidates = [self.step_locators(page_step.params[0], page_step.options) for page_step in dropdowns]
+        values = read_values(self.driver, [[(by, value) for by, value, _ in step_candidates]
+                                           for step_candidates in candidates])
+        unchanged = []
+        for page_step, (displayed, _) in zip(dropdowns, values):
+            # 和选择选项时一样的匹配规则: 简历值在已知选项中会选择的就是显示的选项
+            # "Select One" 不会匹配任何简历值
+            field = page_step.options.get("field") or page_step.params[0]
+            if is_selected_option(page_step.params[1], displayed, self.dropdown_options.options(self.tenant, field),
+                                  page_step.options.get("value_is_pattern", False)):
+                unchanged.append(page_step)
+        return unchanged
+
+    def execute_step(self, page_step):
+        # --- 执行指令逻辑 (和之前一样) ---
+        if page_step.action == "LOCATE_AND_FILL":
+            return self.locate_and_fill(*page_step.params, page_step.options)
+        elif page_step.action == "LOCATE_AND_CLICK":
+            return self.locate_and_click(*page_step.params, page_step.options)
+        elif page_step.action == "LOCATE_DROPDOWN_AND_FILL":
+            return self.locate_dropdown_and_fill(*page_step.params, page_step.options)
+        elif page_step.action == "LOCATE_AND_UPLOAD":
+            return self.locate_and_upload(*page_step.params, page_step.options)
+        elif page_step.action == "LOCATE_AND_DRAG_DROP":
+            return self.locate_and_drag_drop(*page_step.params, page_step.options)
+        else:
+            raise RuntimeError(f"Unknown instruction: {page_step.action} \n"
+                               f" called with params : {page_step.params} \n "
+                               f"and options : {page_step.options} ")
 
+    def execute_instructions(self, instructions):
+        """执行页面步骤, 依赖未满足的步骤在页面变化后重试, 返回未能完成的步骤"""
+        try:
+            unfilled = StepScheduler(self).run(instructions)
+        except RuntimeError as e:
+            self.capture_failure(e)
+            raise
+        # 和之前一样, 列表中只保留未完成的步骤
+        instructions[:] = unfilled
+        return unfilled
+
+    def capture_failure(self, error):
+        """保存失败时的页面现场, 只在当前线程中获取快照, 压缩和写入在后台进行"""
+        name = capture_failure(self.driver, self.failures, error, self.tenant,
+                               self.tracer.current_page, self.tracer.steps)
+        if name:
+            print(f"[INFO] failure artifacts: {os.path.join(self.failures.directory, name)}")
+
+    def open_application_form(self):
+        """从职位页面进入申请表单"""
         # 点击adventure按钮
         self.execute_instructions([
             PageStep(action="LOCATE_AND_CLICK",
@@ -264,12 +442,17 @@ class WorkdayAutofill:
                      options={"required": False})
         ])
 
+    def create_account(self):
+        """尝试创建一个新账号"""
+        print("[INFO] 尝试创建账号")
+        self.open_application_form()
+
         # 等待email输入框出现
         self.wait_for_element_presence('//input[@data-automation-id="email"]', 10)
 
         # 填写邮箱和密码
-        email = self.resume_data["account"]["email"]
-        password = self.resume_data["account"]["password"]
+        email = self.resume.account.email
+        password = self.resume.account.password
 
         self.execute_instructions([
             PageStep(action="LOCATE_AND_FILL",
@@ -293,15 +476,16 @@ class WorkdayAutofill:
             ])
 
         # 点击创建账号按钮
-        time.sleep(2)
+        self.readiness.wait_until_ready("dom_settle")
+        signature = self.readiness.page_signature()
         self.execute_instructions([
             PageStep(action="LOCATE_AND_CLICK",
                      params=['//div[@data-automation-id="click_filter"]'],  # Changed from signInButton to signInLink
             )
         ])
 
-        # 等待 5 秒
-        time.sleep(5)
+        # 等待页面跳转或错误消息出现
+        self.readiness.wait_for_transition(signature, "create_account")
         print("[INFO] 创建账号结束")
 
         # 检查是否有错误消息（账号可能已存在）
@@ -324,8 +508,8 @@ class WorkdayAutofill:
         email_xpath = '//text()[contains(.,"Email Address")]/following::input[1]'
         password_xpath = '//text()[contains(.,"Password")]/following::input[1]'
         submit_xpath = '//div[contains(@aria-label,"Sign In")]'
-        email = self.resume_data["account"]["email"]
-        password = self.resume_data["account"]["password"]
+        email = self.resume.account.email
+        password = self.resume.account.password
         self.execute_instructions([
             # locate email input & fill
             PageStep(action="LOCATE_AND_FILL",
@@ -342,14 +526,15 @@ class WorkdayAutofill:
         ])
 
         # submit
-        time.sleep(2)
+        self.readiness.wait_until_ready("dom_settle")
+        signature = self.readiness.page_signature()
         self.execute_instructions([
             PageStep(action="LOCATE_AND_CLICK",
                      params=[submit_xpath])
         ])
         
         # 等待登录完成
-        time.sleep(5)
+        self.readiness.wait_for_transition(signature, "login")
         print("[INFO] 登录完成")
         
         # 验证登录成功 - 检查是否不再有登录按钮
@@ -362,252 +547,95 @@ class WorkdayAutofill:
         return True  # 返回True让流程继续
 
     def fill_my_information_page(self):
-        # Previous work
-        # time.sleep(5)
-        if self.resume_data["my-information"]["previous-work"]:
-            previous_work_xpath = '//text()[contains(.,"former")]/following::input[1]'
-
+        self.execute_instructions(self.page_steps(self.page_plan("my_information").steps))
+        # Submit
+        return self.save_and_continue('//div//button[contains(text(),"Save and Continue")]')
+
+    def page_plan(self, page_name):
+        """页面的步骤计划, 每份简历只编译一次"""
+        return compile_page_plan(self.resume, page_name)
+
+    @staticmethod
+    def page_steps(templates):
+        """计划中的步骤模板 -> 这次填写使用的 PageStep"""
+        page_steps = []
+        for template in templates:
+            params = [template.xpath]
+            if template.action != "LOCATE_AND_CLICK":
+                params.append(today_date() if template.value == TODAY_VALUE else template.value)
+            page_steps.append(PageStep(action=template.action, params=params, options=dict(template.options)))
+        return page_steps
+
+    def section_steps(self, section):
+        """
+        面板中的步骤来自编译好的计划, 只有是否需要点击添加按钮根据当前页面快照决定
+        每个面板的步骤依赖面板本身, 以及创建它的添加按钮步骤
+        """
+        instructions = []
+        if not section.items:
+            return instructions
+        if section.heading and not self.check_section_exist(section.heading):
+            return instructions
+        # 面板 idx 由哪个添加按钮步骤创建
+        add_steps = {}
+        # 首先检查页面上是否已存在第一个面板
+        if not self.snapshot.has_text(section.panel_texts[0]):
+            # 只有在不存在面板时才点击添加按钮
+            add_steps[1] = f"{section.add_name}-1"
+            instructions.append(PageStep(action="LOCATE_AND_CLICK", params=[section.add_button], name=add_steps[1]))
         else:
-            previous_work_xpath = '//text()[contains(.,"former")]/following::input[2]'
-
-        # instructions List of ordered steps :
-        # a list of (Action, HTML Xpath, Value, options ...)
-        # options is not required
-        instructions = [
-            # How Did You Hear About Us
-            (PageStep(action="LOCATE_AND_FILL",
-                      params=['//div//text()[contains(., "How Did You Hear About Us?")]'
-                              '/following::input[1]',
-                              self.resume_data["my-information"]["source"]],
-                      options={"press_enter": True})),
-            # Previous work
-            PageStep(action="LOCATE_AND_CLICK",
-                     params=[previous_work_xpath]),
-            # Country
-            PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                     params=['//div//text()[contains(., "Country")]'
-                             '/following::button[@aria-haspopup="listbox"][1]',
-                             self.resume_data["my-information"]["country"]]),
-            # ****** Legal Name ******
-            # First Name
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div//text()[contains(., "First Name")]'
-                             '/following::input[1]',
-                             self.resume_data["my-information"]["first-name"]]),
-            # Last Name
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div//text()[contains(., "Last Name")]'
-                             '/following::input[1]',
-                             self.resume_data["my-information"]["last-name"]]),
-            # ****** Address ******
-            # Line 1
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div[@aria-labelledby="Address-section"]'
-                             '//text()[contains(., "Address Line 1")]'
-                             '/following::input[1]',
-                             self.resume_data["my-information"]["address-line"]]),
-            # City
-            # PageStep(action="LOCATE_AND_FILL",
-            #          params=['//div[@aria-labelledby="Address-section"]'
-            #                  '//text()[contains(., "City")]'
-            #                  '/following::input[1]',
-            #                  self.resume_data["my-information"]["city"]]),
-            # 中国是下拉的
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=['//div[@aria-labelledby="Address-section"]'
-            #                  '//text()[contains(., "City")]'
-            #                  '/following::button[@aria-haspopup="listbox"][1]',
-            #                  self.resume_data["my-information"]["city"]]),
-
-            # State
-            PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                     params=['//div[@aria-labelledby="Address-section"]'
-                             '//text()[contains(., "State")]'
-                             '/following::button[@aria-haspopup="listbox"][1]',
-                             self.resume_data["my-information"]["state"]]),
-            # Zip
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div[@aria-labelledby="Address-section"]'
-                             '//text()[contains(., "Postal Code")]'
-                             '/following::input[1]',
-                             self.resume_data["my-information"]["zip"]]),
-
-            # ****** Phone ******
-            # Device Type
-            PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                     params=['//div//text()[contains(., "Phone Device Type")]'
-                             '/following::button[@aria-haspopup="listbox"][1]',
-                             self.resume_data["my-information"]["phone-device-type"]]),
-            # Phone Code
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div//text()[contains(., "Country Phone Code")]/following::input[1]',
-                             self.resume_data["my-information"]["phone-code-country"]],
-                     options={'press_enter': True}),
-            # Number
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div//text()[contains(., "Phone Number")]/following::input[1]',
-                             self.resume_data["my-information"]["phone-number"]]),
-            # Extension
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//div//text()[contains(., "Phone Extension")]'
-                             '/following::input[1]',
-                             self.resume_data["my-information"]["phone-extension"]]),
-            # # Submit
-            PageStep(action="LOCATE_AND_CLICK",
-                     params=['//div//button[contains(text(),"Save and Continue")]']),
-        ]
-
-        self.execute_instructions(instructions)
-        # 等待页面加载
-        time.sleep(5)
-        return True
-
-    def add_works(self, instructions):
-        # check if there are work experiences
-        if len(self.load_work_experiences()):
-            # 首先检查页面上是否已存在工作经历输入框
-            if not self.check_element_exist('//*[contains(text(),"Work Experience 1")]'):
-                # 只有在不存在输入框时才点击添加按钮
+            print(f"[INFO] {section.panel_texts[0]} already exists, skipping add button")
+
+        for idx, templates in enumerate(section.items, start=1):
+            panel = element_present(section.panels[idx - 1])
+            dependencies = [panel] + ([after(add_steps[idx])] if idx in add_steps else [])
+            instructions += depend_on(self.page_steps(templates), *dependencies)
+            # check if more panels remaining
+            if idx == len(section.items):
+                continue
+            if not self.snapshot.has_text(section.panel_texts[idx]):
+                # 只有在不存在下一个面板时才点击添加按钮, 当前面板出现之后再点击
+                add_steps[idx + 1] = f"{section.add_name}-{idx + 1}"
                 instructions.append(PageStep(action="LOCATE_AND_CLICK",
-                                            params=[
-                                                '//div[@aria-labelledby="Work-Experience-section"]//button[@data-automation-id="add-button"]']))
+                                             params=[section.add_another_buttons[idx - 1]],
+                                             name=add_steps[idx + 1],
+                                             depends_on=[panel]))
             else:
-                print("[INFO] Work Experience section already exists, skipping add button")
-            
-            # fill work experiences
-            works_count = len(self.load_work_experiences())
-            for idx, work in enumerate(self.load_work_experiences(), start=1):
-                print(idx)
-                instructions += [
-                    # Job title
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"Job Title")]/following::Input[1]',
-                                     work["job-title"]]),
-                    # Company
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"Company")]/following::Input[1]',
-                                     work["company"]]),
-                    # Location
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"Location")]/following::Input[1]',
-                                     work["location"]]),
-                    # From Date
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"From")]/following::input[contains(@aria-valuetext, "MM") or contains(@aria-valuetext, "YYYY")][1]',
-                                     work["from"]]),
-                    # Description
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"Role Description")]/following::textarea[1]',
-                                     work["description"]])
-                ]
-                # Current work
-                if not work["current-work"]:
-                    # To Date
-                    instructions.append(PageStep(action="LOCATE_AND_FILL",
-                                                 params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//text()[contains(.,"To")]/following::input[contains(@aria-valuetext, "MM") or contains(@aria-valuetext, "YYYY") ][1]',
-                                                         work["to"]]))
-
-                else:
-                    instructions.append(
-                        PageStep(action="LOCATE_AND_CLICK",
-                                 params=[f'//div[@aria-labelledby="Work-Experience-{idx}-panel"]//label[contains(.,"I currently work here")]/following-sibling::div[1]//input[@type="checkbox" and @aria-checked="false"]']),
-                    )
-                # check if more work experiences remaining
-                if not idx == works_count:
-                    # 检查下一个工作经历是否已存在
-                    if not self.check_element_exist(f'//*[contains(text(),"Work Experience {idx+1}")]'):
-                        # 只有在不存在下一个工作经历输入框时才点击添加按钮
-                        instructions.append(
-                            PageStep(action="LOCATE_AND_CLICK",
-                                    params=['//div[@aria-labelledby="Work-Experience-section"]//button[@data-automation-id="add-button"]']),
-                        )
-                    else:
-                        print(f"[INFO] Work Experience {idx+1} already exists, skipping add button")
+                print(f"[INFO] {section.panel_texts[idx]} already exists, skipping add button")
         return instructions
 
-    def add_education(self, instructions):
-        # check if there are education experiences
-        if len(self.load_education_experiences()):
-            # 首先检查页面上是否已存在教育经历输入框
-            if not self.check_element_exist('//*[contains(text(),"Education 1")]'):
-                # 只有在不存在输入框时才点击添加按钮
-                instructions.append(
-                    PageStep(action="LOCATE_AND_CLICK",
-                            params=['//div[@aria-labelledby="Education-section"]//button[@data-automation-id="add-button"]'])
-                )
-            else:
-                print("[INFO] Education section already exists, skipping add button")
-
-            # fill work experiences
-            educations_count = len(self.load_education_experiences())
-            for idx, education in enumerate(self.load_education_experiences(), start=1):
-                instructions += [
-                    # School or University
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     f'/following::text()[contains(.,"School or University")]'
-                                     f'/following::input[1]',
-                                     education["university"]]),
-                    # Degree
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     f'/following::text()[contains(.,"Degree")]'
-                                     f'/following::button[1]',
-                                     education["degree"]],
-                             options={
-                                 "value_is_pattern": True
-                             }),
-                    # Field of study
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     f'/following::text()[contains(.,"Field of Study")]'
-                                     f'/following::input[1]',
-                                     education["field-of-study"]],
-                             options={"press_enter": True}),
-                    # Gpa
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     '/following::text()[contains(.,"Overall Result")]/'
-                                     'following::input[1]',
-                                     education["gpa"]]),
-                    # From date
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     '/following::text()[contains(.,"From")]/'
-                                     'following::input[contains(@aria-valuetext, "MM")'
-                                     ' or contains(@aria-valuetext, "YYYY") ][1]',
-                                     education["from"]]),
-
-                    # To date
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[f'//text()[contains(.,"Education {idx}")]'
-                                     f'/following::text()[contains(.,"To")]'
-                                     f'/following::input[contains(@aria-valuetext, "MM")'
-                                     f' or contains(@aria-valuetext, "YYYY") ][1]',
-                                     education["to"]]),
-                ]
-
-                # check if more education experiences remaining
-                if not idx == educations_count:
-                    # 检查下一个教育经历是否已存在
-                    if not self.check_element_exist(f'//*[contains(text(),"Education {idx+1}")]'):
-                        # 只有在不存在下一个教育经历输入框时才点击添加按钮
-                        instructions.append(PageStep(action="LOCATE_AND_CLICK",
-                                                    params=['//div[@aria-labelledby="Education-section"]//button[@data-automation-id="add-button"]']))
-                    else:
-                        print(f"[INFO] Education {idx+1} already exists, skipping add button")
-        return instructions
-
-    def add_resume(self, instructions):
-        instructions += [
-            # delete the old resume if exist
-            PageStep(action="LOCATE_AND_CLICK",
-                     params=['//button[@data-automation-id="delete-file"]']),
-            PageStep(action="LOCATE_AND_FILL",
-                     params=['//input[@data-automation-id="file-upload-input-ref"]',
-                             self.resume_data["my-experience"]["resume"]]),
-        ]
-        return instructions
+    def start_resume_upload(self):
+        """
+        在填写其它字段之前开始上传简历, 上传在浏览器中继续进行
+        :return: 是否需要等待上传完成 (同名同大小的简历已经上传时不需要)
+        """
+        resume_file = self.resume.resume_file
+        if not resume_file:
+            return False
+        if not os.path.isfile(resume_file):
+            print(f"[WARNING] resume file {resume_file} does not exist, skipping the upload")
+            return False
+        with self.tracer.step(None, action="START_UPLOAD", params=[resume_file]) as record:
+            try:
+                started = start_upload(self.driver, resume_file)
+            except selenium_exceptions.NoSuchElementException:
+                print("[INFO] Skipping resume upload because the page has no upload input")
+                record.outcome = "missing"
+                return False
+            record.outcome = "started" if started else "already attached"
+        if not started:
+            print(f"[INFO] {resume_file} is already attached, skipping the upload")
+        return started
+
+    def wait_for_resume_upload(self):
+        """等待 Workday 显示已上传的简历 (文件标签出现, 进度条消失)"""
+        started_at = time.perf_counter()
+        uploaded = wait_for_upload(self.driver, self.resume.resume_file, self.readiness.get_timeout("upload"))
+        elapsed = time.perf_counter() - started_at
+        self.tracer.record_wait("upload", "upload", elapsed, uploaded)
+        if not uploaded:
+            print(f"[WARNING] resume upload not confirmed after {elapsed:.2f}s")
+        return uploaded
 
     def check_element_exist(self, xpath):
         """检查页面上是否存在指定XPath的元素"""
@@ -620,170 +648,60 @@ class WorkdayAutofill:
 
     def check_section_exist(self, section_name):
         """检查页面上是否存在特定名称的部分"""
-        xpath = f'//h3[contains(text(),"{section_name}")]'
-        result = self.check_element_exist(xpath)
+        result = self.snapshot.has_heading(section_name, tags=("h3",))
         if not result:
             print(f"[INFO] Skipping section {section_name} because it doesn't exist")
         return result
 
-    def add_languages(self, instructions):
-        # CHECK IF LANGUAGES SECTION EXIST
-        if not self.check_section_exist("Languages"):
-            return instructions
-        
-        languages_data = self.load_languages()
-        if len(languages_data):
-            # 首先检查页面上是否已存在语言输入框
-            if not self.check_element_exist('//*[contains(text(),"Languages 1")]'):
-                # 只有在不存在输入框时才点击添加按钮
-                instructions.append(
-                    PageStep(action="LOCATE_AND_CLICK",
-                             # Assuming a container similar to other sections
-                             params=['//div[@aria-labelledby="Languages-section"]//button[contains(text(),"Add")][1]']) 
-                )
-            else:
-                 print("[INFO] Languages section already exists, skipping add button")
-
-            # fill Languages
-            languages_count = len(languages_data)
-            for idx, language in enumerate(languages_data, start=1):
-                # Fluent ? (Assuming fluent checkbox needs similar relative path if applicable)
-                if language["fluent"]:
-                    instructions.append(
-                        PageStep(action="LOCATE_AND_CLICK",
-                                 params=[f'//text()[contains(.,"Languages {idx}")]'
-                                         f'/following::text()[contains(.,"I am fluent in this language")]'
-                                         f'/following::input[1]']))
-                instructions += [
-                    # Language
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Languages {idx}")]'
-                                     f'/following::text()[contains(.,"Language")]'
-                                     f'/following::button[1]',
-                                     language["language"]],
-                             options={"value_is_pattern": True}),
-                    # Reading
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Languages {idx}")]'
-                                     f'/following::text()[contains(.,"Level")]'
-                                     f'/following::button[1]',
-                                     language["level"]],
-                             options={"value_is_pattern": True}),
-
-                    # Reading
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Languages {idx}")]'
-                                     f'/following::text()[contains(.,"Reading Proficiency")]'
-                                     f'/following::button[1]',
-                                     language["comprehension"]],
-                             options={"value_is_pattern": True}),
-
-                    # Speaking
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                            params=[f'//text()[contains(.,"Languages {idx}")]'
-                                    f'/following::text()[contains(.,"Speaking Proficiency")]'
-                                    f'/following::button[1]',
-                                    language["overall"]],
-                            options={"value_is_pattern": True}),
-                    # Translation
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Languages {idx}")]'
-                                     f'/following::text()[contains(.,"Translation")]'
-                                     f'/following::button[1]',
-                                     language["reading"]],
-                             options={"value_is_pattern": True}),
-                    # Writing
-                    PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                             params=[f'//text()[contains(.,"Languages {idx}")]'
-                                     f'/following::text()[contains(.,"Writing Proficiency")]'
-                                     f'/following::button[1]',
-                                     language["writing"]],
-                             options={"value_is_pattern": True}),
-                ]
-
-                # check if more languages remaining
-                if not idx == languages_count:
-                    # 检查下一个语言输入框是否已存在
-                    if not self.check_element_exist(f'//*[contains(text(),"Languages {idx+1}")]'):
-                         # 只有在不存在下一个输入框时才点击添加按钮
-                        instructions.append(
-                            PageStep(action="LOCATE_AND_CLICK",
-                                     # Assuming the "Add Another" button is within the current language item's scope
-                                     params=[f'//text()[contains(.,"Languages {idx}")]/following::button[contains(text(),"Add Another")][1]']), # Example XPath, might need refinement
-                        )
-                    else:
-                        print(f"[INFO] Languages {idx+1} already exists, skipping add another button")
-        return instructions
-
-    def add_websites(self, instructions):
-        if not self.check_section_exist("Websites"):
-            return instructions
-
-        websites_data = self.resume_data["my-experience"]["websites"]
-        websites_count = len(websites_data)
-        if websites_count:
-            # 首先检查页面上是否已存在网站输入框
-            # Using a more specific check based on expected label/input structure
-            if not self.check_element_exist('//*[contains(text(),"Professional Websites(s) 1")]'): 
-                # 只有在不存在输入框时才点击添加按钮
-                instructions.append(
-                    PageStep(action="LOCATE_AND_CLICK",
-                            # Assuming a container similar to other sections
-                             params=['//div[@aria-labelledby="Websites-section"]//button[contains(text(),"Add")][1]']), # Example XPath, might need refinement
-
-                )
-            else:
-                 print("[INFO] Websites section already exists, skipping add button")
-
-            # fill websites
-            for idx, website in enumerate(websites_data, start=1):
-                instructions += [
-                    # Website
-                    PageStep(action="LOCATE_AND_FILL",
-                             params=[
-                                 f'//text()[contains(.,"Professional Websites(s) {idx}")]'
-                                    '/following::text()[contains(.,"URL")]/'
-                                    'following::input[1]',
-                                 website])
-                ]
-                # check if more websites remaining
-                if not idx == websites_count:
-                     # 检查下一个网站输入框是否已存在
-                    if not self.check_element_exist(f'//*[contains(text(),"Professional Websites(s) {idx+1}")]'):
-                        # 只有在不存在下一个输入框时才点击添加按钮
-                        instructions.append(
-                            PageStep(action="LOCATE_AND_CLICK",
-                                     # Assuming the "Add Another" button is within the current website item's scope
-                                     params=[f'//text()[contains(.,"Professional Websites(s) {idx}")]/following::button[contains(text(),"Add Another")][1]']), # Example XPath, might need refinement
-                        )
-                    else:
-                         print(f"[INFO] Website {idx+1} already exists, skipping add another button")
-
-        return instructions
+    def expand_panels(self):
+        """
+        一次调用点击所需次数的添加按钮, 并等待所有工作经历和教育经历面板出现
+        返回是否创建了面板
+        """
+        sections = [
+            ("Work-Experience", len(self.resume.works)),
+            ("Education", len(self.resume.educations)),
+        ]
+        expanded = False
+        for section, wanted in sections:
+            existing = self.snapshot.count_panels(section)
+            if wanted <= existing:
+                continue
+            add_button = f'//div[@aria-labelledby="{section}-section"]//button[@data-automation-id="add-button"]'
+            with self.tracer.step(None, action="EXPAND_PANELS", params=[section]) as record:
+                started_at = time.perf_counter()
+                count = expand_panels(self.driver, add_button, section, wanted,
+                                      self.readiness.get_timeout("dom_settle"))
+                self.tracer.record_wait(section, "panels", time.perf_counter() - started_at, count >= wanted)
+                record.outcome = f"{count}/{wanted} panels"
+            print(f"[INFO] {section}: {existing} -> {count} panels")
+            expanded = True
+        return expanded
 
     def fill_my_experience_page(self):
+        self.snapshot = PageSnapshot.take(self.driver)
+        if self.expand_panels():
+            # 新的面板已经存在, 构建步骤时不再需要点击添加按钮
+            self.snapshot = PageSnapshot.take(self.driver)
+        plan = self.page_plan("my_experience")
         instructions = []
-        steps = {
-            "WORKS": self.add_works,
-            "EDUCATION": self.add_education,
-            "LANGUAGES": self.add_languages,
-            "RESUME": self.add_resume,
-            "WEBSITES": self.add_websites,
-        }
-        for step_name, action in steps.items():
-            print(f"[INFO] adding {step_name}")
-            instructions = action(instructions)
-
+        for section_name in ("works", "education"):
+            print(f"[INFO] adding {section_name}")
+            instructions += self.section_steps(plan.section(section_name))
+        # 面板中的步骤都依赖各自的面板, 可以调整顺序: 所有面板的文本框在一次调用中填写, 日期和复选框在之后
+        instructions = ([page_step for page_step in instructions if self.is_batchable_fill(page_step)]
+                        + [page_step for page_step in instructions if not self.is_batchable_fill(page_step)])
+        for section_name in ("languages", "websites"):
+            print(f"[INFO] adding {section_name}")
+            instructions += self.section_steps(plan.section(section_name))
+
+        # 简历在填写其它字段的同时上传
+        print("[INFO] uploading RESUME")
+        uploading = self.start_resume_upload()
         self.execute_instructions(instructions=instructions)
-        # 等待页面加载, 等等简历上传的
-        time.sleep(5)
-        self.execute_instructions([
-            PageStep(action="LOCATE_AND_CLICK",
-                     params=[
-                         '//button[contains(text(),"Save and Continue")]'])
-        ])
-        time.sleep(5) # 等待跳转
-        return True
+        if uploading:
+            self.wait_for_resume_upload()
+        return self.save_and_continue()
 
     def fill_self_identify(self):
         if self.check_application_review_reached():
@@ -791,110 +709,29 @@ class WorkdayAutofill:
         else:
             print("[INFO] Please complete the required information and ")
         # fill the available information until it reach review page
-        information = self.load_additional_information()
-        selfIdentify = self.load_self_identify()
-        instructions = [
-            # # 18 yo ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"Are you at least 18")]'
-            #                  f'/following::button[1]',
-            #                  information["above-18-year"]]),
-            # # high school or GED ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"Do you have a high school")]'
-            #                  f'/following::button[1]',
-            #                  information["high-school-diploma"]]),
-            # # authorized to work ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"authorized to work")]'
-            #                  f'/following::button[1]',
-            #                  information["work-authorization"]]),
-            # # visa sponsorship ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"sponsorship")]'
-            #                  f'/following::button[1]',
-            #                  information["visa-sponsorship"]]),
-            # # Serving military ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"Have you served")]'
-            #                  f'/following::button[1]',
-            #                  information["served-military"]]),
-            # # military spouse ?
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"former military spouse")]'
-            #                  f'/following::button[1]',
-            #                  information["military-spouse"]]),
-            # # Protected veteran
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"Protected Veteran")]'
-            #                  f'/following::button[1]',
-            #                  information["protected-veteran"]]),
-            # # ethnicity
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"ethnicity category")]'
-            #                  f'/following::button[1]',
-            #                  information["ethnicity"]]),
-            # # Gender / self identification
-            # PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-            #          params=[f'//text()[contains(.,"Gender")]'
-            #                  f'/following::button[1]',
-            #                  information["self-identification"]]),
-            #
-            # # Accept Terms ?
-            # PageStep(action="LOCATE_AND_CLICK"
-            #          , params=[
-            #             f'//text()[contains(.,"I consent to")]'
-            #             f'/following::input[1]'
-            #          ],
-            #          options={"required": False}
-            #         ),
-
-
-
-            ## SELF Identify
-            # Language
-            PageStep(action="LOCATE_DROPDOWN_AND_FILL",
-                     params=[f'//h2[contains(text(),"Self Identify")]'
-                             f'/following::text()[contains(.,"Language")]'
-                             f'/following::button[1]',
-                             selfIdentify["language"]]),
-            # Name
-            PageStep(action="LOCATE_AND_FILL",
-                     params=[f'//h2[contains(text(),"Self Identify")]'
-                             f'/following::text()[contains(.,"Name")]'
-                             f'/following::input[1]',
-                             self.resume_data["my-information"]["first-name"] +
-                             " " +
-                             self.resume_data["my-information"]["last-name"]
-                             ]),
-            # Today's Date
-            PageStep(action="LOCATE_AND_FILL",
-                     params=[f'//h2[contains(text(),"Self Identify")]'
-                             f'/following::text()[contains(.,"Date")]'
-                             f'/following::input[1]',
-                             today_date_in_keys()]),
-        ]
-
-        self.execute_instructions(instructions=instructions)
+        self.execute_instructions(instructions=self.page_steps(self.page_plan("self_identify").steps))
         # 等待页面加载
-        time.sleep(5)
+        self.readiness.wait_until_ready("dom_settle")
 
-        self.execute_instructions([
-            PageStep(action="LOCATE_AND_CLICK",
-                     params=[
-                         f'//h2[contains(text(),"Self Identify")]'
-                         f'/following::label[contains(text(),"No,")]'
-                     ],
-                     )
-        ])
-        time.sleep(1)
+        self.execute_instructions(self.page_steps(self.page_plan("self_identify_disability").steps))
+        self.readiness.wait_until_ready("dom_settle")
 
+        return self.save_and_continue()
+
+    def save_and_continue(self, button_xpath='//button[contains(text(),"Save and Continue")]', required=True):
+        """点击 Save and Continue 并等待下一个页面就绪"""
+        signature = self.readiness.page_signature()
         self.execute_instructions([
             PageStep(action="LOCATE_AND_CLICK",
-                     params=[
-                         '//button[contains(text(),"Save and Continue")]'])
+                     params=[button_xpath],
+                     options={"required": required})
         ])
-        return True
+        return self.readiness.wait_for_transition(signature, "save_and_continue")
+
+    def check_session_valid(self):
+        """已登录时页面上不再有登录按钮"""
+        self.readiness.wait_until_ready("page_load")
+        return not self.check_element_exist('//button[@data-automation-id="signInLink"]')
 
     def check_application_review_reached(self):
         try:
@@ -914,40 +751,17 @@ class WorkdayAutofill:
         else:
             return bool(element)
 
-    def identify_current_page(self):
+    def identify_current_page(self, snapshot=None):
         """识别当前页面类型，返回页面类型标识符"""
-        try:
-            # 检查是否在登录页面
-            if self.check_element_exist('//button[@data-automation-id="signInLink"]'):
-                return "登录页面"
-            
-            # 检查各个主要部分
-            if self.check_element_exist('//h2[contains(text(),"My Information")]'):
-                return "个人信息页面"
-            
-            if self.check_element_exist('//div[@aria-labelledby="Work-Experience-section"]'):
-                return "工作经历页面"
-                
-            # if self.check_element_exist('//div[@aria-labelledby="Education-section"]'):
-            #     return "教育经历页面"
-                
-            if self.check_element_exist('//h2[contains(text(),"Self Identify")]'):
-                return "附加信息页面"
-                
-            if self.check_element_exist('//h2[contains(text(),"Review")]'):
-                return "审核页面"
-                
-            # 检查是否在创建账号页面
-            if self.check_element_exist('//input[@data-automation-id="email"]'):
-                return "创建账号页面"
-            
-        except Exception as e:
-            print(f"[错误] 页面识别失败: {e}")
-        
-        return "未知页面"
+        if snapshot is None:
+            snapshot = PageSnapshot.take(self.driver)
+        return snapshot.classify()
 
     def handle_manual_operation(self):
         """处理需要人工干预的情况"""
+        if not self.interactive:
+            print("[退出] 非交互模式, 无法处理当前页面")
+            return False
         print("\n[需要人工干预] 无法自动识别或处理当前页面")
         print("请手动完成当前页面操作，完成后输入下一步操作:")
         print("1 - 继续自动处理")
@@ -961,12 +775,7 @@ class WorkdayAutofill:
         elif choice == "2":
             # 尝试点击保存并继续按钮
             try:
-                self.execute_instructions([
-                    PageStep(action="LOCATE_AND_CLICK",
-                            params=['//button[contains(text(),"Save and Continue")]'],
-                            options={"required": False})
-                ])
-                time.sleep(3)  # 等待页面加载
+                self.save_and_continue(required=False)
                 return True
             except Exception as e:
                 print(f"[错误] 无法提交表单: {e}")
@@ -976,78 +785,140 @@ class WorkdayAutofill:
             return False
 
     def submit_application(self):
-        """提交最终申请"""
+        """提交最终申请, 只有点击了 Submit 并看到确认信息或页面跳转才返回True"""
         print("[操作] 尝试提交申请...")
         try:
-            self.execute_instructions([
+            signature = self.readiness.page_signature()
+            unfilled = self.execute_instructions([
                 PageStep(action="LOCATE_AND_CLICK",
                         params=['//button[contains(text(),"Submit")]'],
                         options={"required": False})
             ])
-            print("[成功] 申请已提交!")
-            return True
+            if unfilled:
+                print("[错误] 未找到 Submit 按钮")
+                submitted = False
+            else:
+                submitted = (self.readiness.wait_for_transition(signature, "submit")
+                             or self.check_application_submitted())
+            if not submitted:
+                print("[错误] 提交后没有看到确认信息, 申请未提交")
+                if not self.handle_manual_operation():
+                    return False
+                # 用户手动处理后, 以页面上的确认信息为准
+                submitted = self.check_application_submitted()
         except Exception as e:
             print(f"[错误] 提交申请失败: {e}")
-            return self.handle_manual_operation()
-
-    def start_application(self):
-        """开始申请流程"""
+            if not self.handle_manual_operation():
+                return False
+            submitted = self.check_application_submitted()
+        if submitted:
+            print("[成功] 申请已提交!")
+            # 已提交的申请不再需要检查点
+            self.checkpoints.clear(self.application_link, self.resume.account.email)
+            self.checkpoint = None
+        return submitted
+
+    def check_application_submitted(self):
+        """Workday 提交成功后显示确认信息"""
+        return self.check_element_exist(APPLICATION_SUBMITTED_XPATH)
+
+    def sign_in(self):
+        """打开申请链接, 复用已保存的会话或者创建账号/登录"""
+        tenant_host = get_tenant_host(self.application_link)
+        email = self.resume.account.email
+        session_restored = self.sessions.restore(self.driver, self.application_link, email)
         self.driver.get(self.application_link)
         print("[开始] 访问申请链接...")
-        
-        # 先执行固定的登录注册流程
-        print("[INFO] 执行登录/注册流程")
-        
-        # 首先尝试创建账号
-        account_created = self.create_account()
-        
-        # 如果创建账号失败（可能是已存在），则尝试登录
-        if not account_created:
-            self.login()
-        
-        print("[INFO] 登录/注册完成，开始自动填写表单")
-        time.sleep(5)  # 等待页面加载
-        
-        # 循环处理剩余的表单页面
-        max_attempts = 10  # 防止无限循环
-        attempts = 0
-        
-        while attempts < max_attempts:
-            attempts += 1
-            # 等待页面加载
-            time.sleep(3)
-            
-            # 检查是否已完成申请
-            if self.check_application_review_reached():
-                print("[完成] 申请已到达审核页面")
-                self.submit_application()
-                break
-            
-            # 识别并处理当前页面
-            page_type = self.identify_current_page()
-            print(f"[信息] 当前识别页面类型: {page_type}")
-            
-            # 根据页面类型处理表单
-            if page_type == "个人信息页面":
-                print("[信息] 填写个人信息")
-                self.fill_my_information_page()
-            elif page_type == "工作经历页面":
-                print("[信息] 填写工作经历")
-                self.fill_my_experience_page()
-            elif page_type == "附加信息页面":
-                print("[信息] 填写附加信息")
-                self.fill_self_identify()
+
+        if session_restored and self.check_session_valid():
+            # 已登录, 跳过创建账号和登录
+            print("[INFO] 复用已保存的会话")
+            if self.checkpoint is not None and self.checkpoint.resume_url:
+                # 直接回到第一个未完成的页面
+                print(f"[INFO] 从检查点继续: 已完成 {', '.join(self.checkpoint.completed_pages)}")
+                self.driver.get(self.checkpoint.resume_url)
             else:
-                # 未知表单页面，询问用户
-                print(f"[警告] 检测到未知页面类型: {page_type}")
-                if not self.handle_manual_operation():
-                    break
-        
-        if attempts >= max_attempts:
-            print("[警告] 达到最大尝试次数，可能存在循环或页面识别问题")
-            self.handle_manual_operation()
+                self.open_application_form()
+        else:
+            if session_restored:
+                print("[INFO] 已保存的会话已过期, 重新登录")
+                self.sessions.invalidate(tenant_host, email)
+            # 先执行固定的登录注册流程
+            print("[INFO] 执行登录/注册流程")
+
+            # 首先尝试创建账号
+            account_created = self.create_account()
+
+            # 如果创建账号失败（可能是已存在），则尝试登录
+            if not account_created:
+                self.login()
+
+            if self.check_session_valid():
+                self.sessions.save(self.driver, tenant_host, email)
+
+    def fill_page(self, page_type):
+        """
+        填写一个页面并点击 Save and Continue, 已保存过的页面只点击 Save and Continue
+        返回页面是否已保存, 未知页面返回 None
+        """
+        page_handlers = {
+            MY_INFORMATION_PAGE: self.fill_my_information_page,
+            MY_EXPERIENCE_PAGE: self.fill_my_experience_page,
+            SELF_IDENTIFY_PAGE: self.fill_self_identify,
+        }
+        if page_type not in page_handlers:
+            return None
+        if self.checkpoint is None:
+            self.load_checkpoint()
+        if self.checkpoint.is_page_completed(page_type):
+            # Workday 已经保存了这个页面的内容
+            print(f"[INFO] {page_type} 已在之前的运行中保存, 跳过填写")
+            saved = self.save_and_continue(required=False)
+            if not saved:
+                self.checkpoint.reopen_page(page_type)
+        else:
+            # 未保存页面的输入不会被 Workday 保留, 整页重新填写
+            saved = page_handlers[page_type]()
+        if saved:
+            self.checkpoint.complete_page(page_type, self.driver.current_url)
+        return saved
+
+    def build_state_machine(self):
+        """每种页面的处理函数和保存后预期的下一个页面"""
+        machine = PageStateMachine(self)
+        machine.register(MY_INFORMATION_PAGE, lambda: self.fill_page(MY_INFORMATION_PAGE),
+                         next_states=[MY_EXPERIENCE_PAGE])
+        machine.register(MY_EXPERIENCE_PAGE, lambda: self.fill_page(MY_EXPERIENCE_PAGE),
+                         next_states=[SELF_IDENTIFY_PAGE, REVIEW_PAGE])
+        machine.register(SELF_IDENTIFY_PAGE, lambda: self.fill_page(SELF_IDENTIFY_PAGE),
+                         next_states=[REVIEW_PAGE])
+        machine.register(REVIEW_PAGE, self.submit_application, final=True)
+        return machine
+
+    def run_pages(self):
+        """从当前页面开始处理剩余的表单页面, 到达审核页面并提交后返回True"""
+        return self.build_state_machine().run()
+
+    def load_checkpoint(self):
+        self.checkpoint = self.checkpoints.load(self.application_link, self.resume.account.email)
+        return self.checkpoint
+
+    def start_application(self):
+        """开始申请流程, 到达审核页面并提交后返回True"""
+        self.load_checkpoint()
+        with self.tracer.page("sign_in"):
+            self.sign_in()
         
+        print("[INFO] 登录/注册完成，开始自动填写表单")
+        completed = self.run_pages()
+
+        print(f"[INFO] browser profile: {self.browser_profile}")
+        self.readiness.print_summary()
+        self.tracer.print_summary()
+        trace_path = self.tracer.export(self.tenant)
+        print(f"[INFO] trace exported to {trace_path}.jsonl / {trace_path}.trace.json")
         print("[结束] 申请流程已完成")
+        return completed
 
     def wait_for_element_presence(self, xpath, timeout=None, description=None):
         """
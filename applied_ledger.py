@@ -0,0 +1,152 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+LEDGER_PATH = "/tmp/custom/workday-applied.sqlite3"
+# batch_runner statuses, an application with this outcome is never started again
+SUBMITTED_STATUS = "completed"
+
+# .../job/{location}/{title}_{requisition id}[/apply/applyManually]
+# the title has no underscore, the id may have some (R12345_1)
+REQUISITION_PATTERN = re.compile(r"/job/[^/]+/[^/_]*_([^/?]+)")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    tenant TEXT NOT NULL,
+    requisition_id TEXT NOT NULL,
+    account TEXT NOT NULL,
+    link TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_page TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS applications_key ON applications (tenant, requisition_id, account);
+CREATE INDEX IF NOT EXISTS applications_status ON applications (status);
+"""
+
+
+def requisition_id(application_link):
+    """
+    the job requisition id of a posting, e.g. ".../job/Remote/Engineer_JR-1000/apply" -> "JR-1000"
+    links without one are identified by their job path
+    """
+    path = urlparse(application_link).path
+    match = REQUISITION_PATTERN.search(path)
+    if match:
+        return match.group(1)
+    return re.sub(r"/apply(/applyManually)?/?$", "", path).rstrip("/")
+
+
+def application_key(application_link, email):
+    return urlparse(application_link).netloc.lower(), requisition_id(application_link), email.lower()
+
+
+class AppliedLedger:
+    """SQLite ledger of the applications, one row per (tenant, job requisition, account)"""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # shared by the threads of the batch runner
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(SCHEMA)
+
+    def lookup(self, application_link, email):
+        """:return: the row of the application as a dict, None if it was never started"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT * FROM applications WHERE tenant = ? AND requisition_id = ? AND account = ?",
+                application_key(application_link, email)).fetchone()
+        return dict(row) if row else None
+
+    def is_submitted(self, application_link, email):
+        row = self.lookup(application_link, email)
+        return row is not None and row["status"] == SUBMITTED_STATUS
+
+    def record(self, application_link, email, status, last_page=None, error=None):
+        """one more attempt of the application and its outcome"""
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO applications (tenant, requisition_id, account, link, status, attempts,"
+                " last_page, error, created_at, updated_at) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?)"
+                " ON CONFLICT (tenant, requisition_id, account) DO UPDATE SET"
+                " link = excluded.link, status = excluded.status, attempts = attempts + 1,"
+                " last_page = COALESCE(excluded.last_page, last_page), error = excluded.error,"
+                " updated_at = excluded.updated_at",
+                (*application_key(application_link, email), application_link, status,
+                 last_page, error, now, now))
+
+    def tenant_stats(self):
+        """:return: [(tenant, applications, submitted, success rate)] by tenant"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT tenant, COUNT(*), SUM(status = ?) FROM applications GROUP BY tenant ORDER BY tenant",
+                (SUBMITTED_STATUS,)).fetchall()
+        return [(tenant, total, submitted, submitted / total) for tenant, total, submitted in rows]
+
+    def pending_retries(self, max_attempts=None):
+        """the applications not submitted yet, those that used up `max_attempts` are left out"""
+        query = "SELECT * FROM applications WHERE status != ?"
+        params = [SUBMITTED_STATUS]
+        if max_attempts is not None:
+            query += " AND attempts < ?"
+            params.append(max_attempts)
+        with self.lock:
+            rows = self.connection.execute(query + " ORDER BY updated_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+def print_stats(ledger):
+    print(f"    {'tenant':<40} {'applied':>8} {'submitted':>10} {'success':>8}")
+    for tenant, total, submitted, rate in ledger.tenant_stats():
+        print(f"    {tenant:<40} {total:8d} {submitted:10d} {rate:8.0%}")
+
+
+def print_pending(ledger, max_attempts):
+    rows = ledger.pending_retries(max_attempts)
+    print(f"[INFO] {len(rows)} applications to retry")
+    for row in rows:
+        updated_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["updated_at"]))
+        print(f"    {row['status']:<10} x{row['attempts']} {updated_at} {row['account']} "
+              f"{row['last_page'] or '-'} {row['link']}")
+        if row["error"]:
+            print(f"        {row['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the ledger of the applications")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="ledger database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="success rate per tenant")
+    pending = commands.add_parser("pending", help="applications not submitted yet")
+    pending.add_argument("--max-attempts", type=int, help="leave out applications tried this often")
+    args = parser.parse_args()
+
+    ledger = AppliedLedger(args.ledger)
+    try:
+        if args.command == "stats":
+            print_stats(ledger)
+        else:
+            print_pending(ledger, args.max_attempts)
+    finally:
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
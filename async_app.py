@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+
+import selenium.common.exceptions as selenium_exceptions
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from webdriver_manager.core.os_manager import ChromeType
+
+from app import WorkdayAutofill
+from batch_manifest import jobs_for_resume, load_application_links
+from browser_profiles import BROWSER_PROFILES, apply_request_blocking, get_browser_profile
+from failure_artifacts import shared_writer
+from webdrivers_installer import get_web_driver_path
+
+
+class SharedBrowser:
+    """
+    One Chrome process shared by several applications.
+    Every application gets its own browser context (isolated cookies) and tab,
+    driven by its own WebDriver session attached over the DevTools address,
+    so blocking commands of different tabs don't wait for each other.
+    """
+
+    def __init__(self, headless=True, browser_profile=None):
+        self.driver_path = get_web_driver_path(requested_browser="chrome", chrome_type=ChromeType.GOOGLE)
+        self.browser_profile, self.profile = get_browser_profile(browser_profile, headless)
+        self.controller = WorkdayAutofill.create_webdriver("chrome", headless=headless, profile=self.browser_profile)
+        self.debugger_address = self.controller.capabilities["goog:chromeOptions"]["debuggerAddress"]
+
+    def open_tab(self):
+        """:return: (browser context id, driver attached to a new tab of that context)"""
+        context_id = self.controller.execute_cdp_cmd(
+            "Target.createBrowserContext", {"disposeOnDetach": False})["browserContextId"]
+        target_id = self.controller.execute_cdp_cmd(
+            "Target.createTarget", {"url": "about:blank", "browserContextId": context_id})["targetId"]
+        options = webdriver.ChromeOptions()
+        options.debugger_address = self.debugger_address
+        driver = webdriver.Chrome(service=ChromeService(executable_path=self.driver_path), options=options)
+        # chromedriver window handles are the devtools target ids
+        driver.switch_to.window(target_id)
+        # launch flags are shared by the tabs, blocked URLs are set per tab
+        apply_request_blocking(driver, self.profile)
+        return context_id, driver
+
+    def close_tab(self, context_id, driver):
+        try:
+            # detaching a session from a browser started elsewhere leaves the browser running
+            driver.quit()
+        except selenium_exceptions.WebDriverException:
+            pass
+        try:
+            self.controller.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except selenium_exceptions.WebDriverException:
+            pass
+
+    def close(self):
+        try:
+            self.controller.quit()
+        except selenium_exceptions.WebDriverException:
+            pass
+
+
+class AsyncWorkdayAutofill:
+    """
+    WorkdayAutofill driving one tab of a SharedBrowser from the event loop.
+    Selenium is blocking, so each tab runs the synchronous flow (sign in, then the page state machine)
+    in its own thread through asyncio.to_thread: one thread per tab, the event loop only schedules them.
+    """
+
+    def __init__(self, autofill, context_id):
+        self.autofill = autofill
+        self.context_id = context_id
+
+    @classmethod
+    async def create(cls, browser, application_link, resume_path, resume=None):
+        context_id, driver = await asyncio.to_thread(browser.open_tab)
+        autofill = await asyncio.to_thread(
+            WorkdayAutofill, application_link, resume_path, interactive=False, driver=driver,
+            browser_profile=browser.browser_profile, resume=resume)
+        return cls(autofill, context_id)
+
+    async def sign_in(self):
+        return await asyncio.to_thread(self.autofill.sign_in)
+
+    async def run_pages(self):
+        return await asyncio.to_thread(self.autofill.run_pages)
+
+    async def start_application(self):
+        """same flow as WorkdayAutofill.start_application, returns True once submitted"""
+        await asyncio.to_thread(self.autofill.load_checkpoint)
+        await self.sign_in()
+        # the page state machine waits in its own thread, the other tabs keep running
+        completed = await self.run_pages()
+        print(f"[INFO] browser profile: {self.autofill.browser_profile}")
+        self.autofill.readiness.print_summary()
+        self.autofill.tracer.print_summary()
+        self.autofill.tracer.export(self.autofill.tenant)
+        return completed
+
+
+async def run_applications(application_links, resume_path, tabs=4, headless=True, browser_profile=None):
+    """
+    Run the applications in tabs of a single browser, at most `tabs` at once.
+    Applications of the same account on the same tenant never run at the same time, they would share one
+    Workday session (as in BatchRunner)
+    :return: {application link: submitted}
+    """
+    jobs = await asyncio.to_thread(jobs_for_resume, application_links, resume_path)
+    browser = await asyncio.to_thread(SharedBrowser, headless, browser_profile)
+    semaphore = asyncio.Semaphore(tabs)
+    # (tenant host, account email) -> lock held while one of its applications runs
+    account_locks = {}
+
+    async def run_one(job):
+        application_link = job.application_link
+        # the account lock first: a job waiting for its account does not hold a tab
+        async with account_locks.setdefault(job.account_key, asyncio.Lock()), semaphore:
+            tab = None
+            try:
+                tab = await AsyncWorkdayAutofill.create(browser, application_link, resume_path, job.resume)
+                return await tab.start_application()
+            except Exception as e:
+                print(f"[错误] {application_link}: {type(e).__name__}: {e}")
+                return False
+            finally:
+                if tab is not None:
+                    await asyncio.to_thread(browser.close_tab, tab.context_id, tab.autofill.driver)
+
+    try:
+        results = await asyncio.gather(*(run_one(job) for job in jobs))
+    finally:
+        await asyncio.to_thread(browser.close)
+        # the tabs share one writer thread, a daemon: wait for the failure captures still queued
+        await asyncio.to_thread(shared_writer().flush)
+    return dict(zip(application_links, results))
+
+
+def run_applications_sync(application_links, resume_path, tabs=4, headless=True, browser_profile=None):
+    """synchronous wrapper of run_applications"""
+    return asyncio.run(run_applications(application_links, resume_path, tabs=tabs, headless=headless,
+                                        browser_profile=browser_profile))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply to several postings in tabs of one browser")
+    parser.add_argument("links", help="file with one application link per line")
+    parser.add_argument("--resume", default="resume.yml", help="resume yaml file")
+    parser.add_argument("--tabs", type=int, default=4, help="number of tabs running at once")
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    parser.add_argument("--profile", choices=sorted(BROWSER_PROFILES), help="browser launch profile")
+    args = parser.parse_args()
+
+    results = run_applications_sync(load_application_links(args.links), args.resume,
+                                    tabs=args.tabs, headless=not args.headed, browser_profile=args.profile)
+    for application_link, submitted in results.items():
+        print(f"    {'submitted' if submitted else 'not submitted':<14} {application_link}")
+
+
+if __name__ == '__main__':
+    main()
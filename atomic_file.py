@@ -0,0 +1,24 @@
+import contextlib
+import os
+import tempfile
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w", **kwargs):
+    """
+    Write `path` through a temporary file moved over it once complete, readers never see a partial file.
+    The temporary file has a unique name, so tabs (threads) and workers (processes) saving the same
+    file at once don't clash.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_file = tempfile.NamedTemporaryFile(mode, dir=directory, prefix=f".{os.path.basename(path)}.",
+                                           suffix=".tmp", delete=False, **kwargs)
+    try:
+        with tmp_file:
+            yield tmp_file
+        os.replace(tmp_file.name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_file.name)
+        raise
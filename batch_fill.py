@@ -0,0 +1,87 @@
+import selenium.common.exceptions as selenium_exceptions
+
+from locators import FIND_ELEMENT_JS
+
+# possible status for every field of a batch
+FILLED = "filled"
+MISSING = "missing"
+ALREADY_FILLED = "already-filled"
+# the field already holds the value (e.g. pre-populated from the candidate profile)
+UNCHANGED = "unchanged"
+UNSUPPORTED = "unsupported"
+
+# Resolves every field and sets each value through the native value setter so
+# React picks up the change, then fires the events Workday listens to.
+# Fields already holding the value (whitespace aside) are left untouched.
+# Returns one [status, winning locator index] per field, in the same order.
+BATCH_FILL_SCRIPT = FIND_ELEMENT_JS + """
+var fields = arguments[0];
+function normalize(text) {
+    return String(text).replace(/\\s+/g, " ").trim();
+}
+var inputSetter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, "value").set;
+var textareaSetter = Object.getOwnPropertyDescriptor(HTMLTextAreaElement.prototype, "value").set;
+return fields.map(function (field) {
+    var found = findElement(field[0]), value = field[1], onlyIfEmpty = field[2];
+    var element = found[0];
+    if (!element) return ["missing", -1];
+    var setter;
+    if (element instanceof HTMLTextAreaElement) {
+        setter = textareaSetter;
+    } else if (element instanceof HTMLInputElement && element.type !== "file") {
+        setter = inputSetter;
+    } else {
+        return ["unsupported", found[1]];
+    }
+    if (normalize(element.value) === normalize(value)) return ["unchanged", found[1]];
+    if (onlyIfEmpty && element.value.trim() !== "") return ["already-filled", found[1]];
+    element.focus();
+    setter.call(element, value);
+    element.dispatchEvent(new Event("input", {bubbles: true}));
+    element.dispatchEvent(new Event("change", {bubbles: true}));
+    element.blur();
+    return ["filled", found[1]];
+});
+"""
+
+
+def batch_fill(driver, fields):
+    """
+    Fill several text fields in a single WebDriver round trip
+    :param fields: list of (locators, value, only_if_empty), locators being a list of (by, value)
+    :return: list of (status, index of the locator that matched), one per field
+    """
+    payload = [[[[by, value] for by, value in locators], str(input_data), bool(only_if_empty)]
+               for locators, input_data, only_if_empty in fields]
+    try:
+        return [tuple(result) for result in driver.execute_script(BATCH_FILL_SCRIPT, payload)]
+    except selenium_exceptions.JavascriptException as e:
+        print(f"[WARNING] batch fill failed, falling back to keystrokes: {e}")
+        return [(UNSUPPORTED, -1)] * len(fields)
+
+
+# Current value of each field: the value of inputs, the displayed text of anything else (listbox buttons).
+# Returns one [value or null when missing, winning locator index] per field.
+READ_VALUES_SCRIPT = FIND_ELEMENT_JS + """
+return arguments[0].map(function (locators) {
+    var found = findElement(locators), element = found[0];
+    if (!element) return [null, -1];
+    var isInput = element instanceof HTMLInputElement || element instanceof HTMLTextAreaElement;
+    var value = isInput ? element.value : element.textContent;
+    return [value.replace(/\\s+/g, " ").trim(), found[1]];
+});
+"""
+
+
+def read_values(driver, fields):
+    """
+    Read the current value of several fields in a single WebDriver round trip
+    :param fields: list of locators, each a list of (by, value)
+    :return: list of (value or None, index of the locator that matched), one per field
+    """
+    payload = [[[by, value] for by, value in locators] for locators in fields]
+    try:
+        return [tuple(result) for result in driver.execute_script(READ_VALUES_SCRIPT, payload)]
+    except selenium_exceptions.JavascriptException as e:
+        print(f"[WARNING] reading the current values failed: {e}")
+        return [(None, -1)] * len(fields)
@@ -0,0 +1,102 @@
+import os
+from dataclasses import dataclass
+from itertools import zip_longest
+from urllib.parse import urlparse
+
+import yaml
+
+from resume_model import Resume, load_resume
+
+
+class ManifestError(ValueError):
+    """the batch manifest does not match the expected format, lists every problem found"""
+
+    def __init__(self, manifest_path, errors):
+        self.errors = errors
+        super().__init__(f"Something went wrong while reading {manifest_path}:\n" +
+                         "\n".join(f" -> {error}" for error in errors))
+
+
+@dataclass(frozen=True, slots=True)
+class BatchJob:
+    application_link: str
+    resume_path: str
+    # parsed once per candidate, handed to the worker instead of the yaml file
+    resume: Resume = None
+
+    @property
+    def email(self):
+        return self.resume.account.email if self.resume else ""
+
+    @property
+    def account_key(self):
+        """one Workday session per (tenant host, account email), see session_store"""
+        return urlparse(self.application_link).netloc.lower(), self.email.lower()
+
+
+def load_application_links(links_path):
+    """one application link per line, empty lines and lines starting with # are ignored"""
+    with open(links_path) as links_file:
+        return [line.strip() for line in links_file
+                if line.strip() and not line.strip().startswith("#")]
+
+
+def interleave(job_lists):
+    """c1 job1, c2 job1, c1 job2, ... so the workers spread over the candidates"""
+    return [job for jobs in zip_longest(*job_lists) for job in jobs if job is not None]
+
+
+def load_manifest(manifest_path):
+    """
+    Batch manifest, paths are relative to the manifest:
+
+        candidates:
+          - resume: alice.yml
+            links:
+              - https://company.wd1.myworkdayjobs.com/...
+          - resume: bob.yml
+            links_file: bob-links.txt
+
+    :return: the BatchJobs, raise ManifestError listing every problem found
+    """
+    with open(manifest_path) as manifest_file:
+        manifest = yaml.safe_load(manifest_file) or {}
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    candidates = manifest.get("candidates") if isinstance(manifest, dict) else None
+    if not isinstance(candidates, list) or not candidates:
+        raise ManifestError(manifest_path, ["missing 'candidates' list"])
+
+    errors = []
+    resumes = {}
+    job_lists = []
+    for idx, candidate in enumerate(candidates, start=1):
+        where = f"candidate {idx}"
+        if not isinstance(candidate, dict) or not candidate.get("resume"):
+            errors.append(f"missing 'resume' in {where}")
+            continue
+        resume_path = os.path.join(base_dir, candidate["resume"])
+        links = list(candidate.get("links") or [])
+        if candidate.get("links_file"):
+            try:
+                links += load_application_links(os.path.join(base_dir, candidate["links_file"]))
+            except OSError as e:
+                errors.append(f"cannot read 'links_file' of {where}: {e}")
+        if not links:
+            errors.append(f"no application links in {where}")
+        # a resume listed for several candidates is still parsed once
+        if resume_path not in resumes:
+            try:
+                resumes[resume_path] = load_resume(resume_path)
+            except (OSError, ValueError) as e:
+                errors.append(f"{where}: {e}")
+                continue
+        job_lists.append([BatchJob(str(link).strip(), resume_path, resumes[resume_path]) for link in links])
+    if errors:
+        raise ManifestError(manifest_path, errors)
+    return interleave(job_lists)
+
+
+def jobs_for_resume(application_links, resume_path):
+    """the jobs of a plain links file applied with a single resume"""
+    resume = load_resume(resume_path)
+    return [BatchJob(application_link, resume_path, resume) for application_link in application_links]
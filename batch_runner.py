@@ -0,0 +1,239 @@
+import argparse
+import json
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from applied_ledger import LEDGER_PATH, AppliedLedger
+from batch_manifest import jobs_for_resume, load_application_links, load_manifest
+from browser_profiles import BROWSER_PROFILES
+
+# job status
+COMPLETED = "completed"
+INCOMPLETE = "incomplete"
+FAILED = "failed"
+TIMEOUT = "timeout"
+# submitted by an earlier run according to the ledger
+SKIPPED = "skipped"
+
+
+def _terminate_on_sigterm(signum, frame):
+    # turn the parent's terminate() into SystemExit so the browser is closed
+    sys.exit(1)
+
+
+def _run_job(application_link, resume_path, resume, headless, browser_profile, connection):
+    """runs inside a dedicated process, so a hung tenant can be killed without affecting the others"""
+    # imported here so the parent process never touches selenium
+    from app import WorkdayAutofill
+
+    signal.signal(signal.SIGTERM, _terminate_on_sigterm)
+    autofill = None
+    last_page = None
+    try:
+        autofill = WorkdayAutofill(application_link=application_link,
+                                   resume_path=resume_path,
+                                   resume=resume,
+                                   headless=headless,
+                                   interactive=False,
+                                   browser_profile=browser_profile)
+        completed = autofill.start_application()
+        last_page = autofill.tracer.last_page()
+        connection.send((COMPLETED if completed else INCOMPLETE, None, last_page))
+    except Exception as e:
+        if autofill is not None:
+            last_page = autofill.tracer.last_page()
+        connection.send((FAILED, f"{type(e).__name__}: {e}", last_page))
+    finally:
+        if autofill is not None:
+            autofill.close()
+        connection.close()
+
+
+class BatchRunner:
+    """
+    Runs many applications at once, each job in its own process and browser.
+    Jobs of the same account on the same tenant never run at the same time, they would share one Workday session.
+    """
+
+    def __init__(self, resume_path=None, workers=4, job_timeout=600, retries=1, headless=True, browser_profile=None,
+                 ledger=None, skip_submitted=True):
+        # resume of plain application links, manifest jobs bring their own
+        self.resume_path = resume_path
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.retries = retries
+        self.headless = headless
+        self.browser_profile = browser_profile
+        self.context = multiprocessing.get_context("spawn")
+        # AppliedLedger, every attempt is recorded and the applications it shows as submitted are skipped
+        self.ledger = ledger
+        self.skip_submitted = skip_submitted
+        self.condition = threading.Condition()
+        # account keys of the jobs being run
+        self.active_accounts = set()
+
+    def run_attempt(self, job):
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=_run_job,
+            args=(job.application_link, job.resume_path, job.resume, self.headless, self.browser_profile, sender),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        last_page = None
+        if receiver.poll(self.job_timeout):
+            try:
+                status, error, last_page = receiver.recv()
+            except EOFError:
+                status, error = FAILED, "worker exited without a result"
+        elif process.is_alive():
+            status, error = TIMEOUT, f"no result after {self.job_timeout}s"
+        else:
+            status, error = FAILED, f"worker exited with code {process.exitcode}"
+        if status != TIMEOUT:
+            # let the worker close its browser
+            process.join(10)
+        if process.is_alive():
+            process.terminate()
+            process.join(10)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        receiver.close()
+        return status, error, last_page
+
+    def run_job(self, job):
+        started_at = time.perf_counter()
+        attempts = 0
+        status, error = FAILED, None
+        while attempts <= self.retries:
+            attempts += 1
+            print(f"[INFO] job {job.application_link} ({job.email}) attempt {attempts}")
+            status, error, last_page = self.run_attempt(job)
+            if self.ledger is not None:
+                self.ledger.record(job.application_link, job.email, status, last_page, error)
+            if status == COMPLETED:
+                break
+            print(f"[WARNING] job {job.application_link} attempt {attempts}: {status} {error or ''}")
+        return {
+            "link": job.application_link,
+            "email": job.email,
+            "status": status,
+            "attempts": attempts,
+            "elapsed": round(time.perf_counter() - started_at, 2),
+            "error": error,
+        }
+
+    def next_job(self, pending):
+        """
+        the first pending job whose account is free on its tenant, waits while all of them are busy
+        :return: (index, job), (None, None) once nothing is pending
+        """
+        with self.condition:
+            while pending:
+                for idx, job in pending:
+                    if job.account_key not in self.active_accounts:
+                        pending.remove((idx, job))
+                        self.active_accounts.add(job.account_key)
+                        return idx, job
+                self.condition.wait()
+            return None, None
+
+    def release(self, job):
+        with self.condition:
+            self.active_accounts.discard(job.account_key)
+            self.condition.notify_all()
+
+    def worker(self, pending, results):
+        while True:
+            idx, job = self.next_job(pending)
+            if job is None:
+                return
+            try:
+                results[idx] = self.run_job(job)
+            finally:
+                self.release(job)
+
+    def run(self, jobs):
+        """
+        jobs: BatchJobs (see batch_manifest), or application links applied with `resume_path`
+        :return: one result per job, in the order of the jobs
+        """
+        jobs = list(jobs)
+        if jobs and isinstance(jobs[0], str):
+            jobs = jobs_for_resume(jobs, self.resume_path)
+        results = [None] * len(jobs)
+        pending = []
+        for idx, job in enumerate(jobs):
+            if self.skip_submitted and self.ledger is not None and self.ledger.is_submitted(job.application_link, job.email):
+                print(f"[INFO] {job.application_link} ({job.email}) already submitted, skipping")
+                results[idx] = {"link": job.application_link, "email": job.email, "status": SKIPPED,
+                                "attempts": 0, "elapsed": 0.0, "error": None}
+            else:
+                pending.append((idx, job))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for future in [executor.submit(self.worker, pending, results) for _ in range(self.workers)]:
+                future.result()
+        return results
+
+
+def print_summary(results):
+    print("[INFO] batch summary")
+    for result in results:
+        print(f"    {result['status']:<10} {result['elapsed']:8.2f}s "
+              f"x{result['attempts']} {result['email']} {result['link']}")
+        if result["error"]:
+            print(f"        {result['error']}")
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print("    " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply to a list of Workday postings in parallel")
+    parser.add_argument("links", nargs="?", help="file with one application link per line")
+    parser.add_argument("--resume", default="resume.yml", help="resume yaml file")
+    parser.add_argument("--manifest", help="yaml file mapping candidate resumes to their application links")
+    parser.add_argument("--workers", type=int, default=4, help="number of browsers running at once")
+    parser.add_argument("--timeout", type=int, default=600, help="timeout of one application (seconds)")
+    parser.add_argument("--retries", type=int, default=1, help="retries of an unfinished application")
+    parser.add_argument("--headed", action="store_true", help="show the browsers")
+    parser.add_argument("--profile", choices=sorted(BROWSER_PROFILES),
+                        help="browser launch profile, fast by default for headless browsers")
+    parser.add_argument("--summary", help="write the results summary to this json file")
+    parser.add_argument("--ledger", default=LEDGER_PATH, help="ledger of the applications, see applied_ledger.py")
+    parser.add_argument("--reapply", action="store_true", help="also apply where the ledger shows a submission")
+    args = parser.parse_args()
+    if not args.links and not args.manifest:
+        parser.error("a links file or --manifest is required")
+
+    ledger = AppliedLedger(args.ledger)
+    runner = BatchRunner(resume_path=args.resume,
+                         workers=args.workers,
+                         job_timeout=args.timeout,
+                         retries=args.retries,
+                         headless=not args.headed,
+                         browser_profile=args.profile,
+                         ledger=ledger,
+                         skip_submitted=not args.reapply)
+    try:
+        if args.manifest:
+            results = runner.run(load_manifest(args.manifest))
+        else:
+            results = runner.run(load_application_links(args.links))
+    finally:
+        ledger.close()
+    print_summary(results)
+    if args.summary:
+        with open(args.summary, "w") as summary_file:
+            json.dump(results, summary_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
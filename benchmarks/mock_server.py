@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_workday")
+# job search API of the career sites, answered from the recorded listing in mock_workday/cxs/{tenant}.json
+JOBS_API_PATTERN = re.compile(r"^/wday/cxs/([^/]+)/([^/]+)/jobs$")
+
+
+class MockWorkdayHandler(SimpleHTTPRequestHandler):
+    """serves the mock Workday pages with a configurable server and render delay"""
+
+    response_delay = 0.0
+    render_delay_ms = 0
+    # keep-alive, as Workday
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.response_delay:
+            time.sleep(self.response_delay)
+        path = self.translate_path(self.path)
+        if not path.endswith(".html") or not os.path.isfile(path):
+            return super().do_GET()
+        with open(path, encoding="utf-8") as page_file:
+            body = page_file.read().replace("{{RENDER_DELAY_MS}}", str(self.render_delay_ms)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.response_delay:
+            time.sleep(self.response_delay)
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        match = JOBS_API_PATTERN.match(self.path.split("?")[0])
+        listing_path = match and os.path.join(MOCK_SITE_DIR, "cxs", f"{match.group(1)}.json")
+        if not listing_path or not os.path.isfile(listing_path):
+            return self.send_error(404)
+        with open(listing_path, encoding="utf-8") as listing_file:
+            postings = json.load(listing_file)["jobPostings"]
+        search_text = (request.get("searchText") or "").lower()
+        if search_text:
+            postings = [posting for posting in postings if search_text in posting["title"].lower()]
+        offset, limit = int(request.get("offset", 0)), min(int(request.get("limit", 20)), 20)
+        body = json.dumps({"total": len(postings), "jobPostings": postings[offset:offset + limit],
+                           "facets": []}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(port=0, response_delay=0.0, render_delay_ms=0):
+    """starts the server in a background thread, returns (server, base url)"""
+    handler = type("ConfiguredMockWorkdayHandler", (MockWorkdayHandler,),
+                   {"response_delay": response_delay, "render_delay_ms": render_delay_ms})
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(handler, directory=MOCK_SITE_DIR))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mock Workday site")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--response-delay", type=float, default=0.0, help="seconds before every response")
+    parser.add_argument("--render-delay", type=int, default=300, help="milliseconds before a page renders")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.port, args.response_delay, args.render_delay)
+    print(f"[INFO] mock Workday site on {base_url}/job.html")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+// Behaviour shared by the mock Workday pages: delayed rendering behind a
+// loading spinner, listbox dropdowns, "Add" buttons creating panels,
+// resume uploads and "Save and Continue" navigation.
+(function () {
+    var renderDelay = parseInt(document.body.getAttribute("data-render-delay") || "0", 10);
+
+    function closeListboxes() {
+        Array.prototype.forEach.call(document.querySelectorAll('[role="listbox"]'), function (listbox) {
+            listbox.parentNode.removeChild(listbox);
+        });
+    }
+
+    function openListbox(button) {
+        closeListboxes();
+        var listbox = document.createElement("ul");
+        listbox.setAttribute("role", "listbox");
+        button.getAttribute("data-options").split("|").forEach(function (label) {
+            var option = document.createElement("li");
+            option.setAttribute("role", "option");
+            var text = document.createElement("div");
+            text.textContent = label;
+            option.appendChild(text);
+            option.addEventListener("click", function () {
+                button.textContent = label;
+                button.setAttribute("aria-expanded", "false");
+                closeListboxes();
+            });
+            listbox.appendChild(option);
+        });
+        button.setAttribute("aria-expanded", "true");
+        button.parentNode.appendChild(listbox);
+    }
+
+    function addPanel(button) {
+        var section = button.getAttribute("data-add-panel");
+        var container = document.getElementById(section + "-panels");
+        var template = document.getElementById(section + "-template").innerHTML;
+        // Workday renders new panels asynchronously, as slowly as the rest of the page
+        setTimeout(function () {
+            var index = container.children.length + 1;
+            var panel = document.createElement("div");
+            panel.setAttribute("aria-labelledby", section + "-" + index + "-panel");
+            panel.innerHTML = template.replace(/\{N\}/g, index);
+            container.appendChild(panel);
+        }, renderDelay);
+    }
+
+    // the file is "stored" after a while, then shown as a chip with a delete button
+    function upload(input) {
+        var file = input.files[0];
+        if (!file) return;
+        var progress = document.createElement("div");
+        progress.setAttribute("data-automation-id", "file-upload-progress-bar");
+        input.parentNode.appendChild(progress);
+        setTimeout(function () {
+            progress.parentNode.removeChild(progress);
+            var chip = document.createElement("div");
+            chip.setAttribute("data-automation-id", "file-upload-item");
+            chip.innerHTML = '<span data-automation-id="file-upload-item-name"></span> <span></span>' +
+                '<button type="button" data-automation-id="delete-file">Delete</button>';
+            chip.children[0].textContent = file.name;
+            chip.children[1].textContent = (file.size / 1024).toFixed(1) + " KB";
+            input.parentNode.parentNode.insertBefore(chip, input.parentNode);
+        }, renderDelay);
+    }
+
+    function navigate(button) {
+        var spinner = document.querySelector('[data-automation-id="loadingSpinner"]');
+        spinner.style.display = "block";
+        setTimeout(function () { window.location.href = button.getAttribute("data-next"); }, renderDelay);
+    }
+
+    document.addEventListener("click", function (event) {
+        var target = event.target;
+        if (!(target instanceof Element)) return;
+        var listboxButton = target.closest('button[aria-haspopup="listbox"]');
+        if (listboxButton) return openListbox(listboxButton);
+        var addButton = target.closest("[data-add-panel]");
+        if (addButton) return addPanel(addButton);
+        var deleteButton = target.closest('[data-automation-id="delete-file"]');
+        if (deleteButton) return deleteButton.parentNode.parentNode.removeChild(deleteButton.parentNode);
+        var nextButton = target.closest("[data-next]");
+        if (nextButton) return navigate(nextButton);
+    });
+
+    document.addEventListener("change", function (event) {
+        var target = event.target;
+        if (target instanceof Element && target.getAttribute("data-automation-id") === "file-upload-input-ref") {
+            upload(target);
+        }
+    });
+
+    // date segments announce their value like Workday's spinbuttons
+    document.addEventListener("input", function (event) {
+        var target = event.target;
+        if (target instanceof Element && target.getAttribute("role") === "spinbutton" && target.value) {
+            target.setAttribute("aria-valuetext", target.value);
+        }
+    });
+
+    // the form appears once the "server" answered
+    setTimeout(function () {
+        document.querySelector('[data-automation-id="loadingSpinner"]').style.display = "none";
+        document.getElementById("content").style.display = "block";
+    }, renderDelay);
+})();
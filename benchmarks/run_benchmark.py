@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, REPOSITORY_DIR)
+
+from app import WorkdayAutofill  # noqa: E402
+from browser_profiles import BROWSER_PROFILES  # noqa: E402
+from checkpoint_store import CheckpointStore  # noqa: E402
+from dropdown_options import DropdownOptionIndex  # noqa: E402
+from locators import LocatorRegistry  # noqa: E402
+from mock_server import start_mock_server  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+SAMPLE_RESUME = os.path.join(REPOSITORY_DIR, "resume_test.yml")
+# a run is a regression when it is this much slower (or needs this many more round trips) than the baseline
+DEFAULT_TOLERANCE = 0.2
+
+
+def write_benchmark_resume(directory):
+    """the sample resume with a throwaway account and a resume file that exists"""
+    with open(SAMPLE_RESUME) as resume_file:
+        resume = yaml.safe_load(resume_file)
+    resume_pdf = os.path.join(directory, "resume.pdf")
+    with open(resume_pdf, "wb") as pdf_file:
+        pdf_file.write(b"%PDF-1.4\n%%EOF\n")
+    resume["account"] = {"email": "benchmark@example.com", "password": "Benchmark1234@"}
+    resume["my-experience"]["resume"] = resume_pdf
+    resume_path = os.path.join(directory, "resume.yml")
+    with open(resume_path, "w") as resume_file:
+        yaml.safe_dump(resume, resume_file, allow_unicode=True)
+    return resume_path
+
+
+def run_once(application_link, resume_path, state_dir, headless=True, browser_profile="default"):
+    """one application against the mock site, returns the measured numbers"""
+    started = time.perf_counter()
+    autofill = WorkdayAutofill(application_link=application_link,
+                               resume_path=resume_path,
+                               headless=headless,
+                               interactive=False,
+                               browser_profile=browser_profile)
+    try:
+        # no saved sessions or learned locators from real tenants leak into the measurement
+        autofill.sessions = SessionStore(os.path.join(state_dir, "sessions"))
+        autofill.checkpoints = CheckpointStore(os.path.join(state_dir, "checkpoints"))
+        autofill.locators = LocatorRegistry(os.path.join(state_dir, "locators.json"))
+        autofill.dropdown_options = DropdownOptionIndex(os.path.join(state_dir, "dropdown-options.json"))
+        completed = autofill.start_application()
+    finally:
+        autofill.close()
+    return {
+        "completed": completed,
+        "wall_time": round(time.perf_counter() - started, 3),
+        "round_trips": autofill.tracer.round_trips,
+        "pages": {page["name"]: page["duration"] for page in autofill.tracer.pages},
+        "page_loads": autofill.readiness.page_load_summary(),
+    }
+
+
+def load_baselines(path=BASELINE_FILE):
+    """:return: {browser profile: result}"""
+    try:
+        with open(path) as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(result, baselines, path=BASELINE_FILE):
+    baselines = dict(baselines, **{result["browser_profile"]: result})
+    with open(path, "w") as baseline_file:
+        json.dump(baselines, baseline_file, indent=2, ensure_ascii=False)
+        baseline_file.write("\n")
+
+
+def find_regressions(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """returns a message for every number that got worse than the baseline allows"""
+    regressions = []
+    if baseline.get("completed") and not result["completed"]:
+        regressions.append("the application no longer reaches the review page")
+    for metric in ("wall_time", "round_trips"):
+        if result[metric] > baseline[metric] * (1 + tolerance):
+            regressions.append(f"{metric}: {result[metric]} > {baseline[metric]} (+{tolerance:.0%})")
+    for page, duration in result["pages"].items():
+        previous = baseline.get("pages", {}).get(page)
+        if previous is not None and duration > previous * (1 + tolerance):
+            regressions.append(f"page {page}: {duration}s > {previous}s (+{tolerance:.0%})")
+    return regressions
+
+
+def print_page_loads(result, default_baseline):
+    """the load time of the documents with this profile next to the default profile ("before")"""
+    page_loads = result.get("page_loads")
+    if not page_loads:
+        return
+    print(f"    {'page load':<24} {page_loads['average_load_ms']:8.0f}ms "
+          f"({page_loads['resources']} resources, {page_loads['transferred_kb']:.0f}KB)")
+    before = (default_baseline or {}).get("page_loads")
+    if before and result["browser_profile"] != "default":
+        gain = before["average_load_ms"] - page_loads["average_load_ms"]
+        print(f"    {'default profile load':<24} {before['average_load_ms']:8.0f}ms "
+              f"({before['resources']} resources, {before['transferred_kb']:.0f}KB), {gain:.0f}ms saved")
+
+
+def print_result(result, baseline):
+    baseline = baseline or {}
+    print(f"[INFO] profile: {result['browser_profile']}, completed: {result['completed']}")
+    print(f"    {'wall time':<24} {result['wall_time']:8.2f}s  (baseline {baseline.get('wall_time', '-')})")
+    print(f"    {'round trips':<24} {result['round_trips']:8d}   (baseline {baseline.get('round_trips', '-')})")
+    for page, duration in result["pages"].items():
+        previous = baseline.get("pages", {}).get(page, "-")
+        print(f"    page {page:<19} {duration:8.2f}s  (baseline {previous})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the application flow against the mock Workday site")
+    parser.add_argument("--render-delay", type=int, default=300, help="milliseconds before a page renders")
+    parser.add_argument("--response-delay", type=float, default=0.05, help="seconds before every response")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    parser.add_argument("--profile", default="default", choices=sorted(BROWSER_PROFILES),
+                        help="browser launch profile, each profile has its own baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(response_delay=args.response_delay, render_delay_ms=args.render_delay)
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            resume_path = write_benchmark_resume(state_dir)
+            result = run_once(f"{base_url}/job.html", resume_path, state_dir,
+                              headless=not args.headed, browser_profile=args.profile)
+    finally:
+        server.shutdown()
+    result["browser_profile"] = args.profile
+    result["render_delay_ms"] = args.render_delay
+    result["response_delay"] = args.response_delay
+
+    baselines = load_baselines()
+    baseline = baselines.get(args.profile)
+    print_result(result, baseline)
+    print_page_loads(result, baselines.get("default"))
+    if args.update_baseline:
+        save_baseline(result, baselines)
+        print(f"[INFO] baseline written to {BASELINE_FILE}")
+        return 0
+    if baseline is None:
+        # nothing to compare against, a silent pass would hide every regression
+        print(f"[ERROR] no baseline for profile {args.profile} in {BASELINE_FILE}, "
+              f"record one with --update-baseline")
+        return 2
+
+    regressions = find_regressions(result, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"[REGRESSION] {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
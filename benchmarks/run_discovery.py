@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from job_discovery import CareerSite, ConnectionPool, JobDiscovery, SearchFilters  # noqa: E402
+from mock_server import MOCK_SITE_DIR, start_mock_server  # noqa: E402
+
+
+def recorded_tenants():
+    return sorted(name[:-len(".json")] for name in os.listdir(os.path.join(MOCK_SITE_DIR, "cxs"))
+                  if name.endswith(".json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discover the postings of the recorded career sites")
+    parser.add_argument("--sites", type=int, default=40, help="career sites, spread over the recorded tenants")
+    parser.add_argument("--response-delay", type=float, default=0.05, help="seconds before every response")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--keyword", action="append", default=[])
+    parser.add_argument("--max-age", type=int)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(response_delay=args.response_delay)
+    tenants = recorded_tenants()
+    # every site is its own career site of a recorded tenant, all answered by the one local host
+    career_sites = [CareerSite.from_url(f"{base_url}/en-US/Site{idx}", tenants[idx % len(tenants)])
+                    for idx in range(args.sites)]
+    pool = ConnectionPool(per_host=args.per_host)
+    started_at = time.perf_counter()
+    try:
+        postings, errors = JobDiscovery(pool, workers=args.workers).discover(
+            career_sites, SearchFilters(keywords=tuple(args.keyword), max_age_days=args.max_age))
+    finally:
+        pool.close()
+        server.shutdown()
+    elapsed = time.perf_counter() - started_at
+    print(f"[INFO] {len(career_sites)} career sites, {len(postings)} postings, {len(errors)} failed sites")
+    print(f"    {'wall time':<24} {elapsed:8.2f}s")
+    print(f"    {'requests':<24} {pool.requests:8d}")
+    print(f"    {'connections':<24} {pool.connections:8d}")
+    for posting in postings[:3]:
+        print(f"    {posting.apply_link}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
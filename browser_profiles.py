@@ -0,0 +1,158 @@
+import itertools
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # windows: no advisory locks, a directory per process
+    fcntl = None
+
+import selenium.common.exceptions as selenium_exceptions
+
+# the profile is chosen with create_webdriver(profile=...), --profile or this environment variable
+BROWSER_PROFILE_ENV = "WORKDAY_BROWSER_PROFILE"
+SHARED_DISK_CACHE_DIR = "/tmp/custom/browser-cache"
+SHARED_DISK_CACHE_SIZE = 512 * 1024 * 1024
+
+# default: the browser as installed, fast: nothing the form does not need,
+# fast-cached: fast + an HTTP cache kept between runs (Workday's scripts are large and rarely change),
+# a browser cannot share its disk cache with another running one, each process claims a numbered slot of it
+BROWSER_PROFILES = {
+    "default": {"block_resources": False, "lean": False, "disk_cache": None},
+    "fast": {"block_resources": True, "lean": True, "disk_cache": None},
+    "fast-cached": {"block_resources": True, "lean": True, "disk_cache": SHARED_DISK_CACHE_DIR},
+}
+
+# analytics and monitoring hosts seen on Workday tenants, never needed to fill a form
+TRACKER_HOSTS = [
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "*.facebook.net",
+    "*.hotjar.com",
+    "*.nr-data.net",
+    "*.newrelic.com",
+    "*.segment.io",
+    "*.pendo.io",
+    "*.qualtrics.com",
+]
+
+# images, fonts and media, blocked inside the page through the DevTools protocol
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+] + [f"*{host[1:]}*" for host in TRACKER_HOSTS]
+
+LEAN_CHROME_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+]
+
+LEAN_FIREFOX_PREFERENCES = {
+    "extensions.update.enabled": False,
+    "app.update.auto": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+}
+
+BLOCKING_FIREFOX_PREFERENCES = {
+    "permissions.default.image": 2,
+    "gfx.downloadable_fonts.enabled": False,
+    "media.autoplay.default": 5,
+    "media.play-stand-alone": False,
+}
+
+
+def get_browser_profile(name=None, headless=False):
+    """
+    the profile given by name, else by the environment, else fast for headless runs
+    :return: (name, profile)
+    """
+    name = name or os.environ.get(BROWSER_PROFILE_ENV) or ("fast" if headless else "default")
+    if name not in BROWSER_PROFILES:
+        raise RuntimeError(f"Unknown browser profile '{name}', choose one of {', '.join(BROWSER_PROFILES)}")
+    return name, BROWSER_PROFILES[name]
+
+
+# parent cache directory -> (slot directory, its open lock file) claimed by this process
+_cache_slots = {}
+_cache_slots_lock = threading.Lock()
+
+
+def _lock_free_slot(parent):
+    """:return: (slot directory, its open lock file), the lock lasts as long as the file is open"""
+    if fcntl is None:
+        return os.path.join(parent, str(os.getpid())), None
+    for slot in itertools.count():
+        lock_file = open(os.path.join(parent, f"{slot}.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            continue
+        return os.path.join(parent, str(slot)), lock_file
+
+
+def claim_disk_cache_dir(parent):
+    """
+    A cache directory under `parent` no other running process uses, locked until this process exits.
+    The next run takes a free slot back, usually the one it used before, and finds its cache warm.
+    """
+    with _cache_slots_lock:
+        if parent not in _cache_slots:
+            os.makedirs(parent, exist_ok=True)
+            _cache_slots[parent] = _lock_free_slot(parent)
+        directory = _cache_slots[parent][0]
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def apply_chrome_profile(options, profile):
+    if profile["lean"]:
+        for argument in LEAN_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+    if profile["block_resources"]:
+        # trackers resolve nowhere, for every tab of the browser
+        options.add_argument("--host-resolver-rules=" + ", ".join(
+            f"MAP {host} ~NOTFOUND" for host in TRACKER_HOSTS))
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if profile["disk_cache"]:
+        options.add_argument(f"--disk-cache-dir={claim_disk_cache_dir(profile['disk_cache'])}")
+        options.add_argument(f"--disk-cache-size={SHARED_DISK_CACHE_SIZE}")
+
+
+def apply_firefox_profile(options, profile):
+    preferences = {}
+    if profile["lean"]:
+        preferences.update(LEAN_FIREFOX_PREFERENCES)
+    if profile["block_resources"]:
+        preferences.update(BLOCKING_FIREFOX_PREFERENCES)
+    if profile["disk_cache"]:
+        preferences["browser.cache.disk.parent_directory"] = claim_disk_cache_dir(profile["disk_cache"])
+        preferences["browser.cache.disk.capacity"] = SHARED_DISK_CACHE_SIZE // 1024
+    for key, value in preferences.items():
+        options.set_preference(key, value)
+
+
+def apply_request_blocking(driver, profile):
+    """block fonts, media and trackers inside the current tab, chrome only"""
+    if not profile["block_resources"] or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except selenium_exceptions.WebDriverException:
+        return False
+    return True
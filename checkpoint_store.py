@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import time
+
+from atomic_file import atomic_write
+
+CHECKPOINTS_DIR = "/tmp/custom/workday-checkpoints"
+# Workday keeps application drafts for a while, older checkpoints are started over
+CHECKPOINT_TTL = 7 * 24 * 60 * 60
+
+
+class Checkpoint:
+    """Progress of one application: the pages Workday saved"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+
+    @property
+    def completed_pages(self):
+        return self.data["completed_pages"]
+
+    @property
+    def resume_url(self):
+        """where the first unfinished page is, None before the first page was saved"""
+        return self.data["resume_url"]
+
+    def is_page_completed(self, page_type):
+        return page_type in self.data["completed_pages"]
+
+    def complete_page(self, page_type, next_url):
+        """the page was saved with Save and Continue, next_url shows the next one"""
+        if page_type not in self.data["completed_pages"]:
+            self.data["completed_pages"].append(page_type)
+        self.data["resume_url"] = next_url
+        self.save()
+
+    def reopen_page(self, page_type):
+        """Workday did not accept the page as saved, it has to be filled again"""
+        if page_type in self.data["completed_pages"]:
+            self.data["completed_pages"].remove(page_type)
+            self.save()
+
+    def save(self):
+        self.data["updated_at"] = time.time()
+        with atomic_write(self.path) as checkpoint_file:
+            json.dump(self.data, checkpoint_file, indent=2, ensure_ascii=False)
+
+
+class CheckpointStore:
+    """On disk application checkpoints keyed by (application link, account email)"""
+
+    def __init__(self, directory=CHECKPOINTS_DIR, ttl=CHECKPOINT_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    def checkpoint_path(self, application_link, email):
+        key = hashlib.sha1(f"{application_link}|{email.lower()}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, application_link, email):
+        """:return: the saved Checkpoint, or an empty one"""
+        path = self.checkpoint_path(application_link, email)
+        try:
+            with open(path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+        except (OSError, ValueError):
+            data = None
+        if data is None or time.time() - data.get("updated_at", 0) > self.ttl:
+            data = {
+                "application_link": application_link,
+                "email": email,
+                "completed_pages": [],
+                "resume_url": None,
+                "updated_at": time.time(),
+            }
+        return Checkpoint(path, data)
+
+    def clear(self, application_link, email):
+        """the application was submitted, its checkpoint is not needed anymore"""
+        try:
+            os.remove(self.checkpoint_path(application_link, email))
+        except FileNotFoundError:
+            pass
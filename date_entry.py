@@ -0,0 +1,122 @@
+import re
+
+import selenium.common.exceptions as selenium_exceptions
+from selenium.webdriver import Keys
+
+# digit -> numpad key, the keystroke fallback types dates with these
+NUMPAD_KEYS = {str(digit): getattr(Keys, f"NUMPAD{digit}") for digit in range(10)}
+
+DATE_PATTERN = re.compile(r"^\s*(?:(\d{1,2})/)?(?:(\d{1,2})/)?(\d{4})\s*$")
+
+# widget types
+SPINBUTTONS_WIDGET = "spinbuttons"
+TEXT_WIDGET = "text"
+
+# arguments: any input of the date widget, {month, day, year} (null for the segments the date doesn't have)
+# Workday renders MM / DD / YYYY spinbuttons, some tenants a single text input.
+# Sets every segment through the native value setter and answers, after React re-rendered,
+# [widget type, whether aria-valuetext (value of a text input) shows the date, whether it already did]
+SET_DATE_SCRIPT = """
+var anchor = arguments[0], date = arguments[1];
+var done = arguments[arguments.length - 1];
+var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, "value").set;
+var PLACEHOLDERS = {MM: "month", DD: "day", YYYY: "year"};
+
+function segmentKind(input) {
+    var id = (input.getAttribute("data-automation-id") || "") + " " + (input.getAttribute("aria-label") || "");
+    if (/month/i.test(id)) return "month";
+    if (/day/i.test(id)) return "day";
+    if (/year/i.test(id)) return "year";
+    return PLACEHOLDERS[input.getAttribute("aria-valuetext") || input.getAttribute("placeholder") || ""] || null;
+}
+function segmentsOf(input) {
+    var container = input.closest('[data-automation-id="dateInputWrapper"]')
+        || input.closest('[data-automation-id^="formField-"]') || input.parentElement;
+    var segments = {};
+    Array.prototype.forEach.call(
+        container.querySelectorAll('input[role="spinbutton"], input[data-automation-id^="dateSection"]'),
+        function (segment) {
+            var kind = segmentKind(segment);
+            if (kind && !segments[kind]) segments[kind] = segment;
+        });
+    return segments;
+}
+function pad(number, width) {
+    var text = String(number);
+    while (text.length < width) text = "0" + text;
+    return text;
+}
+function setValue(input, value) {
+    input.focus();
+    setter.call(input, value);
+    input.dispatchEvent(new Event("input", {bubbles: true}));
+    input.dispatchEvent(new Event("change", {bubbles: true}));
+    input.blur();
+}
+function shown(input) {
+    var text = input.getAttribute("aria-valuetext");
+    return text === null ? input.value : text;
+}
+
+var segments = segmentsOf(anchor);
+var kinds = ["month", "day", "year"].filter(function (kind) { return date[kind] !== null; });
+var widget = kinds.every(function (kind) { return segments[kind]; }) ? "spinbuttons" : "text";
+var text = kinds.map(function (kind) { return pad(date[kind], kind === "year" ? 4 : 2); }).join("/");
+
+function matches() {
+    if (widget === "text") return anchor.value.trim() === text;
+    return kinds.every(function (kind) { return parseInt(shown(segments[kind]), 10) === date[kind]; });
+}
+if (matches()) return done([widget, true, true]);
+if (widget === "text") {
+    setValue(anchor, text);
+} else {
+    kinds.forEach(function (kind) { setValue(segments[kind], pad(date[kind], kind === "year" ? 4 : 2)); });
+}
+var attempts = 0;
+(function verify() {
+    if (matches() || ++attempts >= 8) return done([widget, matches(), false]);
+    setTimeout(verify, 25);
+})();
+"""
+
+
+def parse_date(date_text):
+    """
+    "09/2022" -> {"month": 9, "day": None, "year": 2022}, also "MM/DD/YYYY" and "YYYY"
+    :return: None if the text is not a date
+    """
+    match = DATE_PATTERN.match(str(date_text))
+    if not match:
+        return None
+    first, second, year = match.groups()
+    if second is not None:
+        month, day = first, second
+    else:
+        month, day = first, None
+    return {
+        "month": int(month) if month else None,
+        "day": int(day) if day else None,
+        "year": int(year),
+    }
+
+
+def date_to_numpad_keys(date_text):
+    """the digits of the date as numpad keys, e.g. "09/2022" -> NUMPAD0 NUMPAD9 NUMPAD2 ..."""
+    return [NUMPAD_KEYS[char] for char in str(date_text) if char in NUMPAD_KEYS]
+
+
+def set_date(driver, element, date_text):
+    """
+    Set a date widget in one WebDriver round trip and check what it shows
+    :return: (widget type, verified, unchanged), widget type is None when the date could not be parsed
+    """
+    date = parse_date(date_text)
+    if date is None:
+        return None, False, False
+    try:
+        widget, verified, unchanged = driver.execute_async_script(SET_DATE_SCRIPT, element, date)
+    except selenium_exceptions.JavascriptException as e:
+        print(f"[WARNING] setting the date {date_text} failed: {e}")
+        return None, False, False
+    return widget, verified, unchanged
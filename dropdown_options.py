@@ -0,0 +1,136 @@
+import difflib
+import json
+import re
+import threading
+
+from atomic_file import atomic_write
+
+DROPDOWN_OPTIONS_FILE = "/tmp/custom/workday-dropdown-options.json"
+# below this similarity a label is not considered the same option
+FUZZY_MATCH_CUTOFF = 0.85
+
+# arguments: listbox button, label of the option to click or null, timeout in ms
+# opens the listbox if needed, waits for its options and clicks the one with that label.
+# Always answers with the labels currently offered so a stale cache is refreshed by the same call.
+SELECT_OPTION_SCRIPT = """
+var button = arguments[0], label = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+function normalize(text) {
+    return text.replace(/\\s+/g, " ").trim().toLowerCase();
+}
+function readOptions() {
+    return Array.prototype.filter.call(
+        document.querySelectorAll('[role="listbox"] [role="option"]'),
+        function (option) { return option.offsetParent !== null || option.getClientRects().length; });
+}
+if (button.getAttribute("aria-expanded") !== "true") button.click();
+var deadline = Date.now() + timeout;
+(function poll() {
+    var options = readOptions();
+    if (!options.length && Date.now() < deadline) return setTimeout(poll, 25);
+    var labels = options.map(function (option) { return option.textContent.replace(/\\s+/g, " ").trim(); });
+    if (label !== null) {
+        for (var i = 0; i < options.length; i++) {
+            if (normalize(labels[i]) === normalize(label)) {
+                (options[i].querySelector("div") || options[i]).click();
+                return done({clicked: true, options: labels});
+            }
+        }
+    }
+    done({clicked: false, options: labels});
+})();
+"""
+
+
+def normalize_option(text):
+    """case, punctuation and whitespace insensitive form of an option label"""
+    text = str(text).casefold().replace("&", " and ")
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def match_option(wanted, options, pattern=False):
+    """
+    Pick the option meaning the same as the resume value
+    exact match first, then a label beginning with the other ("United States" / "United States of America",
+    with a pattern the option may contain the value anywhere), then close spellings.
+    Several equally good options are ambiguous: "Mobile" among "Mobile Phone" and "Mobile Work" picks nothing.
+    :return: the option label as offered by the page, or None
+    """
+    wanted = normalize_option(wanted)
+    if not wanted or not options:
+        return None
+    normalized = {}
+    for option in options:
+        normalized.setdefault(normalize_option(option), option)
+    if wanted in normalized:
+        return normalized[wanted]
+
+    def starts(outer, inner):
+        return outer.startswith(f"{inner} ")
+
+    # whole words at the start of a label, "Virginia" is not "West Virginia"
+    candidates = [text for text in normalized if text and (
+        starts(text, wanted) or (not pattern and starts(wanted, text)))]
+    if pattern and not candidates:
+        candidates = [text for text in normalized if f" {wanted} " in f" {text} "]
+    if len(candidates) == 1:
+        return normalized[candidates[0]]
+    if candidates:
+        return None
+
+    close = difflib.get_close_matches(wanted, list(normalized), n=2, cutoff=FUZZY_MATCH_CUTOFF)
+    ratios = [difflib.SequenceMatcher(None, wanted, text).ratio() for text in close]
+    if not close or (len(close) > 1 and ratios[0] == ratios[1]):
+        return None
+    return normalized[close[0]]
+
+
+def is_selected_option(wanted, displayed, options=(), pattern=False):
+    """
+    Whether the dropdown already shows the option the resume value would select.
+    Without the option labels of the dropdown only the exact value counts, "West Virginia" is not "Virginia".
+    """
+    if not displayed:
+        return False
+    if options:
+        selected = match_option(wanted, options, pattern)
+        return selected is not None and normalize_option(selected) == normalize_option(displayed)
+    return normalize_option(wanted) == normalize_option(displayed)
+
+
+# the indexes of the tabs of a process save the same file
+_save_lock = threading.Lock()
+
+
+class DropdownOptionIndex:
+    """Option labels of each listbox, per tenant and field, so later fills can click without reading them"""
+
+    def __init__(self, path=DROPDOWN_OPTIONS_FILE):
+        self.path = path
+        # tenant -> field -> option labels
+        self.known = self.read()
+
+    def options(self, tenant, field):
+        return self.known.get(tenant, {}).get(field, [])
+
+    def record(self, tenant, field, options):
+        options = list(options)
+        if not options or self.options(tenant, field) == options:
+            return
+        self.known.setdefault(tenant, {})[field] = options
+        self.save(tenant, field)
+
+    def read(self):
+        try:
+            with open(self.path) as options_file:
+                return json.load(options_file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, tenant, field):
+        """write the options of the field into what the other tabs and workers saved meanwhile"""
+        with _save_lock:
+            known = self.read()
+            known.setdefault(tenant, {})[field] = self.known[tenant][field]
+            with atomic_write(self.path) as options_file:
+                json.dump(known, options_file, indent=2, ensure_ascii=False)
@@ -0,0 +1,148 @@
+import atexit
+import base64
+import gzip
+import itertools
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+import selenium.common.exceptions as selenium_exceptions
+
+ARTIFACTS_DIR = "/tmp/custom/workday-failures"
+# captures waiting for the writer, newer failures are dropped while it is full
+MAX_PENDING = 8
+# captures kept on disk, the oldest are deleted
+RETENTION = 100
+# steps of the trace stored with a capture
+LAST_STEPS = 30
+
+# the DOM and where we are in one round trip, the screenshot is the only other call
+PAGE_STATE_SCRIPT = """
+return {url: location.href, title: document.title, dom: document.documentElement.outerHTML};
+"""
+
+
+class ArtifactWriter:
+    """
+    Writes failure captures from a background thread: the failing job only pays for taking the
+    snapshot, decoding, compressing, writing and pruning old captures happen here.
+    """
+
+    def __init__(self, directory=ARTIFACTS_DIR, max_pending=MAX_PENDING, retention=RETENTION):
+        self.directory = directory
+        self.retention = retention
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.lock = threading.Condition()
+        # captures queued or being written
+        self.pending = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, name="failure-artifacts", daemon=True)
+        self.thread.start()
+
+    def submit(self, capture):
+        """:return: False when the writer is busy and the capture was dropped"""
+        with self.lock:
+            self.pending += 1
+        try:
+            self.queue.put_nowait(capture)
+        except queue.Full:
+            with self.lock:
+                self.pending -= 1
+                self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout=10):
+        """wait until the queued captures are written, :return: whether they all were"""
+        with self.lock:
+            return self.lock.wait_for(lambda: self.pending == 0, timeout)
+
+    def run(self):
+        while True:
+            capture = self.queue.get()
+            try:
+                self.write(capture)
+                self.prune()
+            except (OSError, ValueError) as e:
+                print(f"[WARNING] writing the failure artifacts failed: {e}")
+                shutil.rmtree(os.path.join(self.directory, f"{capture['name']}.tmp"), ignore_errors=True)
+            finally:
+                with self.lock:
+                    self.pending -= 1
+                    self.lock.notify_all()
+
+    def write(self, capture):
+        path = os.path.join(self.directory, capture["name"])
+        tmp_path = f"{path}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        if capture.get("screenshot"):
+            with open(os.path.join(tmp_path, "screenshot.png"), "wb") as screenshot_file:
+                screenshot_file.write(base64.b64decode(capture["screenshot"]))
+        with gzip.open(os.path.join(tmp_path, "dom.html.gz"), "wt", encoding="utf-8") as dom_file:
+            dom_file.write(capture.get("dom") or "")
+        context = {key: value for key, value in capture.items() if key not in ("screenshot", "dom")}
+        with gzip.open(os.path.join(tmp_path, "context.json.gz"), "wt", encoding="utf-8") as context_file:
+            json.dump(context, context_file, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        """keep the `retention` newest captures"""
+        captures = sorted(name for name in os.listdir(self.directory) if not name.endswith(".tmp"))
+        for name in captures[:max(len(captures) - self.retention, 0)]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+# tells apart captures of the same millisecond
+_capture_numbers = itertools.count(1)
+
+
+def shared_writer(directory=ARTIFACTS_DIR):
+    """
+    one writer thread per directory and process, shared by the tabs of async_app.
+    The thread is a daemon, the captures still queued are written when the interpreter exits
+    """
+    with _writers_lock:
+        if directory not in _writers:
+            os.makedirs(directory, exist_ok=True)
+            _writers[directory] = ArtifactWriter(directory)
+            atexit.register(_writers[directory].flush)
+        return _writers[directory]
+
+
+def capture_failure(driver, writer, error, tenant, page=None, steps=(), last_steps=LAST_STEPS):
+    """
+    Snapshot the page the error happened on and hand it to the writer
+    :return: the name of the capture, None if it could not be taken or was dropped
+    """
+    try:
+        state = driver.execute_script(PAGE_STATE_SCRIPT) or {}
+        screenshot = driver.get_screenshot_as_base64()
+    except selenium_exceptions.WebDriverException as e:
+        print(f"[WARNING] capturing the failure failed: {e}")
+        return None
+    now = time.time()
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "-", f"{tenant}-{page or 'page'}").strip("-")[:80]
+    name = (f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}"
+            f"-{os.getpid()}-{next(_capture_numbers)}-{slug}")
+    capture = {
+        "name": name,
+        "time": now,
+        "error": f"{type(error).__name__}: {error}",
+        "tenant": tenant,
+        "page": page,
+        "url": state.get("url"),
+        "title": state.get("title"),
+        "steps": [step.to_dict() for step in list(steps)[-last_steps:]],
+        "dom": state.get("dom"),
+        "screenshot": screenshot,
+    }
+    if not writer.submit(capture):
+        print("[WARNING] failure artifact writer busy, capture dropped")
+        return None
+    return name
@@ -0,0 +1,277 @@
+import argparse
+import http.client
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+# the listing API answers at most this many postings per request
+PAGE_SIZE = 20
+# requests in flight at once, over all tenants
+DEFAULT_WORKERS = 16
+# keep-alive connections (and requests in flight) per tenant host
+CONNECTIONS_PER_HOST = 4
+REQUEST_TIMEOUT = 15
+
+LOCALE_PATTERN = re.compile(r"^[a-z]{2}-[A-Z]{2}$")
+POSTED_DAYS_PATTERN = re.compile(r"(\d+)\+?\s+days?\s+ago", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class CareerSite:
+    scheme: str
+    host: str
+    tenant: str
+    site: str
+    locale: str
+
+    @classmethod
+    def from_url(cls, url, tenant=None):
+        """
+        https://acme.wd5.myworkdayjobs.com/en-US/External -> tenant acme, site External
+        the tenant is the first label of the host unless given (e.g. for a local stand-in server)
+        """
+        parsed = urlparse(url.strip())
+        parts = [part for part in parsed.path.split("/") if part]
+        locale = parts.pop(0) if parts and LOCALE_PATTERN.match(parts[0]) else ""
+        if not parts:
+            raise ValueError(f"no career site in {url}")
+        return cls(parsed.scheme or "https", parsed.netloc.lower(),
+                   tenant or parsed.netloc.split(".")[0].lower(), parts[0], locale)
+
+    @property
+    def jobs_path(self):
+        return f"/wday/cxs/{self.tenant}/{self.site}/jobs"
+
+    def apply_link(self, external_path):
+        """canonical link of the application form, as the batch runner expects it"""
+        locale = f"/{self.locale}" if self.locale else ""
+        return f"{self.scheme}://{self.host}{locale}/{self.site}{external_path}/apply/applyManually"
+
+
+@dataclass(frozen=True, slots=True)
+class JobPosting:
+    title: str
+    location: str
+    posted_on: str
+    # None when the posting date could not be read
+    posted_days: int
+    apply_link: str
+
+
+@dataclass(frozen=True, slots=True)
+class SearchFilters:
+    # a posting matches any of the keywords (title) and any of the locations
+    keywords: tuple = ()
+    locations: tuple = ()
+    # postings older than this many days are dropped
+    max_age_days: int = None
+
+    def matches(self, posting):
+        title, location = posting.title.lower(), posting.location.lower()
+        if self.keywords and not any(keyword.lower() in title for keyword in self.keywords):
+            return False
+        if self.locations and not any(wanted.lower() in location for wanted in self.locations):
+            return False
+        if self.max_age_days is not None and (posting.posted_days is None
+                                              or posting.posted_days > self.max_age_days):
+            return False
+        return True
+
+
+def parse_posted_days(posted_on):
+    """"Posted Today" -> 0, "Posted Yesterday" -> 1, "Posted 30+ Days Ago" -> 30"""
+    text = (posted_on or "").lower()
+    if "today" in text:
+        return 0
+    if "yesterday" in text:
+        return 1
+    match = POSTED_DAYS_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+class ConnectionPool:
+    """keep-alive connections per host, at most `per_host` requests in flight on a host"""
+
+    def __init__(self, per_host=CONNECTIONS_PER_HOST, timeout=REQUEST_TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        # (scheme, host) -> queue of idle connections, slots of the host
+        self.idle = {}
+        self.slots = {}
+        self.requests = 0
+        self.connections = 0
+
+    def host_pool(self, scheme, host):
+        with self.lock:
+            key = (scheme, host)
+            if key not in self.idle:
+                self.idle[key] = queue.LifoQueue()
+                self.slots[key] = threading.BoundedSemaphore(self.per_host)
+            return self.idle[key], self.slots[key]
+
+    def connect(self, scheme, host):
+        with self.lock:
+            self.connections += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def request_json(self, scheme, host, method, path, payload=None):
+        """:return: the decoded JSON answer, raise RuntimeError on an HTTP error"""
+        idle, slots = self.host_pool(scheme, host)
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        with slots:
+            try:
+                connection = idle.get_nowait()
+            except queue.Empty:
+                connection = self.connect(scheme, host)
+            # a kept-alive connection may have been closed by the server meanwhile, retry once on a new one
+            for attempt in range(2):
+                try:
+                    connection.request(method, path, body=body, headers=headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    connection.close()
+                    if attempt:
+                        raise
+                    connection = self.connect(scheme, host)
+            with self.lock:
+                self.requests += 1
+            if response.will_close:
+                connection.close()
+            else:
+                idle.put(connection)
+        if response.status != 200:
+            raise RuntimeError(f"{method} {scheme}://{host}{path}: HTTP {response.status}")
+        return json.loads(data)
+
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+
+
+class JobDiscovery:
+    """
+    Lists the postings of Workday career sites through their public job search API.
+    The first page of every site tells how many postings there are, the other pages are then fetched
+    concurrently over the pooled connections.
+    """
+
+    def __init__(self, pool=None, workers=DEFAULT_WORKERS, page_size=PAGE_SIZE):
+        self.pool = pool or ConnectionPool()
+        self.workers = workers
+        self.page_size = page_size
+
+    def fetch_page(self, career_site, offset, search_text=""):
+        """:return: (total postings, postings of the page)"""
+        data = self.pool.request_json(career_site.scheme, career_site.host, "POST", career_site.jobs_path, {
+            "appliedFacets": {},
+            "limit": self.page_size,
+            "offset": offset,
+            "searchText": search_text,
+        })
+        postings = [
+            JobPosting(title=job.get("title", ""),
+                       location=job.get("locationsText", ""),
+                       posted_on=job.get("postedOn", ""),
+                       posted_days=parse_posted_days(job.get("postedOn")),
+                       apply_link=career_site.apply_link(job["externalPath"]))
+            for job in data.get("jobPostings") or [] if job.get("externalPath")
+        ]
+        return data.get("total", 0), postings
+
+    def discover(self, career_sites, filters=None, search_text=""):
+        """
+        :return: (matching postings without duplicates, {career site: error} of the sites that failed)
+        """
+        filters = filters or SearchFilters()
+        postings = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_page, site, 0, search_text): (site, 0)
+                       for site in career_sites}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site, offset = futures.pop(future)
+                    try:
+                        total, page = future.result()
+                    except (OSError, RuntimeError, ValueError, http.client.HTTPException) as e:
+                        errors[site] = f"{type(e).__name__}: {e}"
+                        continue
+                    if offset == 0:
+                        # the first page tells how many pages follow
+                        for next_offset in range(self.page_size, total, self.page_size):
+                            futures[executor.submit(self.fetch_page, site, next_offset, search_text)] = \
+                                (site, next_offset)
+                    for posting in page:
+                        if filters.matches(posting):
+                            postings.setdefault(posting.apply_link, posting)
+        return list(postings.values()), errors
+
+
+def load_career_sites(sites_path):
+    """
+    one career site url per line, optionally followed by the tenant name,
+    empty lines and lines starting with # are ignored
+    """
+    career_sites = []
+    with open(sites_path) as sites_file:
+        for line in sites_file:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            career_sites.append(CareerSite.from_url(fields[0], fields[1] if len(fields) > 1 else None))
+    return career_sites
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the application links of Workday career sites")
+    parser.add_argument("sites", help="file with one career site url per line, e.g. "
+                                      "https://acme.wd5.myworkdayjobs.com/en-US/External")
+    parser.add_argument("--keyword", action="append", default=[], help="title keyword, repeatable")
+    parser.add_argument("--location", action="append", default=[], help="location keyword, repeatable")
+    parser.add_argument("--max-age", type=int, help="only postings posted within this many days")
+    parser.add_argument("--search", default="", help="search text sent to Workday")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="requests in flight at once")
+    parser.add_argument("--per-host", type=int, default=CONNECTIONS_PER_HOST, help="connections per tenant")
+    parser.add_argument("--output", help="write the links here (one per line) instead of stdout")
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    pool = ConnectionPool(per_host=args.per_host)
+    discovery = JobDiscovery(pool, workers=args.workers)
+    try:
+        postings, errors = discovery.discover(
+            load_career_sites(args.sites),
+            SearchFilters(tuple(args.keyword), tuple(args.location), args.max_age),
+            search_text=args.search)
+    finally:
+        pool.close()
+    for site, error in errors.items():
+        print(f"[WARNING] {site.host}/{site.site}: {error}", file=sys.stderr)
+    links = "".join(f"{posting.apply_link}\n" for posting in postings)
+    if args.output:
+        with open(args.output, "w") as links_file:
+            links_file.write(links)
+    else:
+        sys.stdout.write(links)
+    print(f"[INFO] {len(postings)} postings, {pool.requests} requests over {pool.connections} connections "
+          f"in {time.perf_counter() - started_at:.2f}s", file=sys.stderr)
+    return 1 if errors and not postings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import json
+import threading
+
+import selenium.common.exceptions as selenium_exceptions
+from selenium.webdriver.common.by import By
+
+from atomic_file import atomic_write
+
+LEARNED_LOCATORS_FILE = "/tmp/custom/workday-locators.json"
+
+# logical field -> ordered locator candidates
+# fast data-automation-id css selectors first, text-axis xpath as the fallback
+# (the xpath of the PageStep is always appended as the last candidate)
+FIELD_LOCATORS = {
+    # My Information
+    "source": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="sourcePrompt"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-source"] input'),
+    ],
+    "country": [
+        (By.CSS_SELECTOR, 'button[data-automation-id="countryDropdown"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-country"] button[aria-haspopup="listbox"]'),
+    ],
+    "first-name": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="legalNameSection_firstName"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-legalName--firstName"] input'),
+    ],
+    "last-name": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="legalNameSection_lastName"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-legalName--lastName"] input'),
+    ],
+    "address-line": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="addressSection_addressLine1"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-addressLine1"] input'),
+    ],
+    "city": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="addressSection_city"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-city"] input'),
+    ],
+    "state": [
+        (By.CSS_SELECTOR, 'button[data-automation-id="addressSection_countryRegion"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-countryRegion"] button[aria-haspopup="listbox"]'),
+    ],
+    "zip": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="addressSection_postalCode"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-postalCode"] input'),
+    ],
+    "phone-device-type": [
+        (By.CSS_SELECTOR, 'button[data-automation-id="phone-device-type"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-phoneType"] button[aria-haspopup="listbox"]'),
+    ],
+    "phone-code-country": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="countryPhoneCode"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-countryPhoneCode"] input'),
+    ],
+    "phone-number": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="phone-number"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-phoneNumber"] input'),
+    ],
+    "phone-extension": [
+        (By.CSS_SELECTOR, 'input[data-automation-id="phone-extension"]'),
+        (By.CSS_SELECTOR, '[data-automation-id="formField-extension"] input'),
+    ],
+    # My Experience, formatted with the panel index
+    "work-job-title": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Work-Experience-{idx}-panel"] input[data-automation-id="jobTitle"]'),
+    ],
+    "work-company": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Work-Experience-{idx}-panel"] input[data-automation-id="company"]'),
+    ],
+    "work-location": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Work-Experience-{idx}-panel"] input[data-automation-id="location"]'),
+    ],
+    "work-description": [
+        (By.CSS_SELECTOR,
+         'div[aria-labelledby="Work-Experience-{idx}-panel"] textarea[data-automation-id="description"]'),
+    ],
+    "work-from": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Work-Experience-{idx}-panel"] '
+                          '[data-automation-id="formField-startDate"] input[role="spinbutton"]'),
+    ],
+    "work-to": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Work-Experience-{idx}-panel"] '
+                          '[data-automation-id="formField-endDate"] input[role="spinbutton"]'),
+    ],
+    "education-university": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] input[data-automation-id="school"]'),
+    ],
+    "education-degree": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] button[data-automation-id="degree"]'),
+    ],
+    "education-field-of-study": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] input[data-automation-id="fieldOfStudy"]'),
+    ],
+    "education-gpa": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] input[data-automation-id="gpa"]'),
+    ],
+    "education-from": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] '
+                          '[data-automation-id="formField-firstYearAttended"] input[role="spinbutton"]'),
+    ],
+    "education-to": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Education-{idx}-panel"] '
+                          '[data-automation-id="formField-lastYearAttended"] input[role="spinbutton"]'),
+    ],
+    "website-url": [
+        (By.CSS_SELECTOR, 'div[aria-labelledby="Websites-{idx}-panel"] input[data-automation-id="website"]'),
+    ],
+}
+
+# Shared by the injected scripts: resolves the first matching locator
+# candidate, xpath expressions are compiled once per document and reused.
+FIND_ELEMENT_JS = """
+function findElement(locators) {
+    var cache = window.__wdXPathCache || (window.__wdXPathCache = {});
+    for (var i = 0; i < locators.length; i++) {
+        var by = locators[i][0], value = locators[i][1], element = null;
+        if (by === "css selector") {
+            element = document.querySelector(value);
+        } else {
+            var expression = cache[value] || (cache[value] = document.createExpression(value, null));
+            element = expression.evaluate(document, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        }
+        if (element) return [element, i];
+    }
+    return [null, -1];
+}
+"""
+
+FIND_ELEMENT_SCRIPT = FIND_ELEMENT_JS + "return findElement(arguments[0]);"
+
+
+def find_first_element(driver, candidates):
+    """
+    Resolve the first matching candidate in one WebDriver round trip
+    :return: (element, candidate) or raise NoSuchElementException
+    """
+    element, index = driver.execute_script(
+        FIND_ELEMENT_SCRIPT, [[by, value] for by, value, _ in candidates])
+    if element is None:
+        raise selenium_exceptions.NoSuchElementException(
+            f"None of the locators matched: {[value for _, value, _ in candidates]}")
+    return element, candidates[index]
+
+
+# the registries of the tabs of a process save the same file
+_save_lock = threading.Lock()
+
+
+class LocatorRegistry:
+    """Ordered locator candidates per logical field, remembering which one won on each tenant"""
+
+    def __init__(self, path=LEARNED_LOCATORS_FILE):
+        self.path = path
+        # tenant -> field -> (by, template) of the winning candidate
+        self.learned = self.read()
+        # (tenant, field, fallback xpath, panel index) -> candidates
+        self.compiled = {}
+
+    def candidates(self, field, tenant, fallback_xpath=None, idx=None):
+        """
+        candidates of a field, the tenant winner first
+        :return: list of (by, value, template) where template identifies the candidate between runs
+        """
+        key = (tenant, field, fallback_xpath, idx)
+        if key not in self.compiled:
+            candidates = [(by, template.format(idx=idx), template)
+                          for by, template in FIELD_LOCATORS.get(field, [])]
+            if fallback_xpath:
+                candidates.append((By.XPATH, fallback_xpath, "fallback"))
+            winner = self.learned.get(tenant, {}).get(field)
+            if winner:
+                candidates.sort(key=lambda candidate: [candidate[0], candidate[2]] != winner)
+            self.compiled[key] = candidates
+        return self.compiled[key]
+
+    def record_winner(self, field, tenant, candidate):
+        by, _, template = candidate
+        if self.learned.get(tenant, {}).get(field) == [by, template]:
+            return
+        self.learned.setdefault(tenant, {})[field] = [by, template]
+        # the candidates order of this field changed
+        self.compiled = {key: value for key, value in self.compiled.items()
+                         if key[0] != tenant or key[1] != field}
+        self.save(tenant, field)
+
+    def read(self):
+        try:
+            with open(self.path) as learned_file:
+                return json.load(learned_file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, tenant, field):
+        """write the winner of the field into what the other tabs and workers saved meanwhile"""
+        with _save_lock:
+            learned = self.read()
+            learned.setdefault(tenant, {})[field] = self.learned[tenant][field]
+            with atomic_write(self.path) as learned_file:
+                json.dump(learned, learned_file, indent=2)
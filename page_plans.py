@@ -0,0 +1,128 @@
+import os
+from dataclasses import dataclass
+
+import yaml
+
+PAGE_DEFINITIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "page_definitions.yml")
+# step value resolved when the page is filled
+TODAY_VALUE = "@today"
+
+
+class PageDefinitionError(ValueError):
+    """page_definitions.yml does not match the expected format"""
+
+
+@dataclass(frozen=True, slots=True)
+class StepTemplate:
+    """a PageStep with its value already taken from the resume"""
+    action: str
+    xpath: str
+    value: object
+    # sorted (key, value) pairs of the PageStep options
+    options: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class SectionPlan:
+    """
+    Panels of a repeated section (works, educations, ...), one per resume item.
+    Which add buttons have to be clicked depends on the live page and is decided when the page is filled.
+    """
+    name: str
+    # the section is only filled when the page has this heading, None for sections every page has
+    heading: str
+    add_name: str
+    add_button: str
+    # per panel: its locator, the text that shows it exists, the button adding the next one and its steps
+    panels: tuple
+    panel_texts: tuple
+    add_another_buttons: tuple
+    items: tuple
+
+
+@dataclass(frozen=True, slots=True)
+class PagePlan:
+    steps: tuple
+    sections: tuple
+
+    def section(self, name):
+        for section in self.sections:
+            if section.name == name:
+                return section
+        raise KeyError(name)
+
+
+_definitions = {}
+_plans = {}
+
+
+def load_page_definitions(path=PAGE_DEFINITIONS_PATH):
+    """the page definitions, read once per process"""
+    if path not in _definitions:
+        with open(path) as definitions_file:
+            _definitions[path] = yaml.safe_load(definitions_file)
+    return _definitions[path]
+
+
+def resolve(data, path):
+    """"my_information.first_name" on the resume, "." is the data itself"""
+    if path in (None, "."):
+        return data
+    for attribute in path.split("."):
+        data = getattr(data, attribute)
+    return data
+
+
+def compile_steps(step_definitions, data, idx=None):
+    templates = []
+    for definition in step_definitions:
+        if "when" in definition and not resolve(data, definition["when"]):
+            continue
+        if "unless" in definition and resolve(data, definition["unless"]):
+            continue
+        if definition.get("action") not in ("LOCATE_AND_FILL", "LOCATE_DROPDOWN_AND_FILL", "LOCATE_AND_CLICK"):
+            raise PageDefinitionError(f"unknown action in {definition}")
+        options = dict(definition.get("options") or {})
+        if definition.get("field"):
+            options["field"] = definition["field"]
+        xpath = definition["xpath"]
+        if idx is not None:
+            xpath = xpath.replace("{idx}", str(idx))
+            options["idx"] = idx
+        value = None
+        if definition["action"] != "LOCATE_AND_CLICK":
+            value = definition["value"] if definition["value"] == TODAY_VALUE else resolve(data, definition["value"])
+        templates.append(StepTemplate(definition["action"], xpath, value, tuple(sorted(options.items()))))
+    return tuple(templates)
+
+
+def compile_section(definition, resume):
+    items = resolve(resume, definition["items"])
+    indexes = range(1, len(items) + 1)
+    return SectionPlan(
+        name=definition["name"],
+        heading=definition.get("heading"),
+        add_name=definition["add_name"],
+        add_button=definition["add_button"],
+        panels=tuple(definition["panel"].replace("{idx}", str(idx)) for idx in indexes),
+        panel_texts=tuple(definition["panel_text"].replace("{idx}", str(idx)) for idx in range(1, len(items) + 2)),
+        add_another_buttons=tuple(definition["add_another_button"].replace("{idx}", str(idx)) for idx in indexes),
+        items=tuple(compile_steps(definition["steps"], item, idx) for idx, item in zip(indexes, items)),
+    )
+
+
+def compile_page_plan(resume, page_name, path=PAGE_DEFINITIONS_PATH):
+    """
+    The plan of a page for this resume, compiled once and shared by every job applying with it
+    :return: PagePlan, raise PageDefinitionError when the page is not defined
+    """
+    key = (path, page_name, resume)
+    if key not in _plans:
+        definition = load_page_definitions(path).get(page_name)
+        if definition is None:
+            raise PageDefinitionError(f"page '{page_name}' is not defined in {path}")
+        _plans[key] = PagePlan(
+            steps=compile_steps(definition.get("steps") or [], resume),
+            sections=tuple(compile_section(section, resume) for section in definition.get("sections") or []),
+        )
+    return _plans[key]
@@ -0,0 +1,238 @@
+import time
+from contextlib import contextmanager
+
+import selenium.common.exceptions as selenium_exceptions
+from selenium.webdriver.support.wait import WebDriverWait
+
+# Workday renders these while a page or a panel is still loading
+LOADING_INDICATOR_SELECTORS = [
+    '[data-automation-id="loadingSpinner"]',
+    '[data-automation-id="loadingIndicator"]',
+    '[data-automation-id="wd-LoadingPanel"]',
+    '[aria-busy="true"]',
+]
+
+# per-transition timeouts (seconds)
+TRANSITION_TIMEOUTS = {
+    "default": 10,
+    "page_load": 20,
+    "dom_settle": 5,
+    "create_account": 15,
+    "login": 15,
+    "save_and_continue": 15,
+    "submit": 15,
+    "upload": 30,
+}
+
+# the DOM must stay untouched this long (ms) before a page is considered ready
+DOM_QUIET_WINDOW_MS = 300
+
+# resolves once no loading indicator is shown and no mutation happened during
+# the quiet window, or once the timeout is reached.
+# A ready page also answers the load timing of its document, so profiles can be compared for free
+WAIT_FOR_QUIET_DOM_SCRIPT = """
+var selectors = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+function navigationTiming() {
+    var entry = performance.getEntriesByType("navigation")[0];
+    if (!entry || !entry.loadEventEnd) return null;
+    var resources = performance.getEntriesByType("resource");
+    var transferred = resources.reduce(function (sum, resource) {
+        return sum + (resource.transferSize || 0);
+    }, entry.transferSize || 0);
+    return {document: performance.timeOrigin, url: location.href, load: entry.loadEventEnd,
+            domContentLoaded: entry.domContentLoadedEventEnd, resources: resources.length,
+            transferred: transferred};
+}
+var start = performance.now(), lastMutation = start;
+var observer = new MutationObserver(function () { lastMutation = performance.now(); });
+observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+function busy() {
+    if (document.readyState !== "complete") return true;
+    // hidden indicators stay in some pages, only a rendered one means loading
+    return selectors.some(function (selector) {
+        return Array.prototype.some.call(document.querySelectorAll(selector), function (element) {
+            return element.getClientRects().length > 0;
+        });
+    });
+}
+(function check() {
+    var now = performance.now();
+    if (!busy() && now - lastMutation >= quietMs) {
+        observer.disconnect();
+        done({ready: true, elapsed: now - start, navigation: navigationTiming()});
+    } else if (now - start >= timeoutMs) {
+        observer.disconnect();
+        done({ready: false, elapsed: now - start});
+    } else {
+        setTimeout(check, 25);
+    }
+})();
+"""
+
+# what identifies "where we are" in the application flow: the URL, the headings and the active step.
+# Validation errors are left out, a rejected page is still the same page.
+# Error messages already shown are marked, only those rendered afterwards count as a new rejection
+PAGE_SIGNATURE_SCRIPT = """
+Array.prototype.forEach.call(document.querySelectorAll('[data-automation-id="errorMessage"]'), function (error) {
+    error.setAttribute("data-wd-seen", "1");
+});
+var headings = Array.prototype.map.call(document.querySelectorAll("h2"), function (h) {
+    return h.textContent.trim();
+});
+var step = document.querySelector('[data-automation-id="progressBarActiveStep"]');
+return [location.href, headings.join("|"), step ? step.textContent.trim() : ""].join("#");
+"""
+
+# answers [signature, error messages rendered since the signature was taken]
+PAGE_STATE_SCRIPT = """
+var headings = Array.prototype.map.call(document.querySelectorAll("h2"), function (h) {
+    return h.textContent.trim();
+});
+var step = document.querySelector('[data-automation-id="progressBarActiveStep"]');
+var errors = document.querySelectorAll('[data-automation-id="errorMessage"]:not([data-wd-seen])').length;
+return [[location.href, headings.join("|"), step ? step.textContent.trim() : ""].join("#"), errors];
+"""
+
+
+@contextmanager
+def restored_script_timeout(driver):
+    """the async script timeout raised for the waits of the block is put back afterwards"""
+    previous = driver.timeouts.script
+    try:
+        yield
+    finally:
+        driver.set_script_timeout(previous)
+
+
+class PageReadiness:
+    """Waits for Workday-specific readiness signals instead of fixed sleeps"""
+
+    def __init__(self, driver, timeouts=None, quiet_window_ms=DOM_QUIET_WINDOW_MS, tracer=None):
+        self.driver = driver
+        self.tracer = tracer
+        self.timeouts = dict(TRANSITION_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.quiet_window_ms = quiet_window_ms
+        # (transition, kind, elapsed seconds, succeeded)
+        self.timings = []
+        # document time origin -> load timing of that document
+        self.page_loads = {}
+
+    def get_timeout(self, transition):
+        return self.timeouts.get(transition, self.timeouts["default"])
+
+    def record(self, transition, kind, started_at, succeeded):
+        elapsed = time.perf_counter() - started_at
+        self.timings.append((transition, kind, elapsed, succeeded))
+        if self.tracer is not None:
+            self.tracer.record_wait(transition, kind, elapsed, succeeded)
+        return elapsed
+
+    def wait_until_ready(self, transition="default", extra_busy_selectors=()):
+        """
+        Wait until no loading indicator is displayed and the DOM stayed quiet
+        for `quiet_window_ms`, returns True if the page settled before the
+        transition timeout
+        """
+        timeout = self.get_timeout(transition)
+        selectors = LOADING_INDICATOR_SELECTORS + list(extra_busy_selectors)
+        started_at = time.perf_counter()
+        deadline = started_at + timeout
+        ready = False
+        with restored_script_timeout(self.driver):
+            while not ready and time.perf_counter() < deadline:
+                remaining_ms = int((deadline - time.perf_counter()) * 1000)
+                self.driver.set_script_timeout(remaining_ms / 1000 + 5)
+                try:
+                    result = self.driver.execute_async_script(
+                        WAIT_FOR_QUIET_DOM_SCRIPT, selectors, self.quiet_window_ms, remaining_ms)
+                except selenium_exceptions.WebDriverException:
+                    # the document was replaced while waiting, observe the new one
+                    time.sleep(0.05)
+                    continue
+                ready = bool(result and result.get("ready"))
+                if ready and result.get("navigation"):
+                    self.page_loads[result["navigation"]["document"]] = result["navigation"]
+        elapsed = self.record(transition, "ready", started_at, ready)
+        if not ready:
+            print(f"[WARNING] page not ready after {elapsed:.2f}s ({transition})")
+        return ready
+
+    def page_signature(self):
+        """taken before the action expected to leave the page, marks the error messages already shown"""
+        try:
+            return self.driver.execute_script(PAGE_SIGNATURE_SCRIPT)
+        except selenium_exceptions.WebDriverException:
+            return None
+
+    def page_state(self):
+        """:return: (signature, new error messages), None while the document is replaced"""
+        try:
+            signature, errors = self.driver.execute_script(PAGE_STATE_SCRIPT)
+        except (selenium_exceptions.WebDriverException, TypeError, ValueError):
+            return None
+        return signature, errors
+
+    def wait_for_transition(self, previous_signature, transition="save_and_continue"):
+        """
+        Wait until the page signature (URL, headings, active step) differs from
+        `previous_signature` or the page shows new error messages.
+        :return: True once another page is ready without error messages,
+                 False when the page stayed or was rejected with validation errors
+        """
+        timeout = self.get_timeout(transition)
+        started_at = time.perf_counter()
+        state = [None, 0]
+
+        def moved_or_rejected(driver):
+            current = self.page_state()
+            if current is None:
+                return False
+            state[:] = current
+            return current[1] > 0 or current[0] != previous_signature
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(moved_or_rejected)
+        except selenium_exceptions.TimeoutException:
+            elapsed = self.record(transition, "transition", started_at, False)
+            print(f"[WARNING] no page transition after {elapsed:.2f}s ({transition})")
+            return False
+        if state[1]:
+            self.record(transition, "transition", started_at, False)
+            print(f"[WARNING] page rejected with {state[1]} error messages ({transition})")
+            return False
+        self.record(transition, "transition", started_at, True)
+        if not self.wait_until_ready(transition):
+            return False
+        # errors rendered while the next page was settling
+        current = self.page_state()
+        if current is not None and current[1]:
+            print(f"[WARNING] page shows {current[1]} error messages after the transition ({transition})")
+            return False
+        return True
+
+    def page_load_summary(self):
+        """average load time (ms), resources and transferred bytes of the documents loaded so far"""
+        loads = list(self.page_loads.values())
+        if not loads:
+            return None
+        return {
+            "documents": len(loads),
+            "average_load_ms": round(sum(load["load"] for load in loads) / len(loads), 1),
+            "resources": sum(load["resources"] for load in loads),
+            "transferred_kb": round(sum(load["transferred"] for load in loads) / 1024, 1),
+        }
+
+    def print_summary(self):
+        total = sum(elapsed for _, _, elapsed, _ in self.timings)
+        print(f"[INFO] page readiness waits: {len(self.timings)} waits, {total:.2f}s total")
+        for transition, kind, elapsed, succeeded in self.timings:
+            status = "ok" if succeeded else "timeout"
+            print(f"    {transition:<20} {kind:<10} {elapsed:6.2f}s {status}")
+        page_loads = self.page_load_summary()
+        if page_loads:
+            print(f"[INFO] page loads: {page_loads['documents']} documents, "
+                  f"{page_loads['average_load_ms']:.0f}ms average, {page_loads['resources']} resources, "
+                  f"{page_loads['transferred_kb']:.0f}KB")
@@ -0,0 +1,119 @@
+import re
+
+import selenium.common.exceptions as selenium_exceptions
+
+# one round trip: everything the page handlers need to know about the current page
+PAGE_SNAPSHOT_SCRIPT = """
+function text(element) {
+    return (element.textContent || "").replace(/\\s+/g, " ").trim();
+}
+function panelOf(element) {
+    var panel = element.closest('[aria-labelledby$="-panel"]');
+    if (!panel) return null;
+    var match = /-(\\d+)-panel$/.exec(panel.getAttribute("aria-labelledby"));
+    return match ? parseInt(match[1], 10) : null;
+}
+function labelOf(element) {
+    if (element.labels && element.labels.length) return text(element.labels[0]);
+    if (element.getAttribute("aria-label")) return element.getAttribute("aria-label");
+    var field = element.closest('[data-automation-id^="formField"]');
+    var label = field && field.querySelector("label");
+    return label ? text(label) : "";
+}
+var headings = Array.prototype.map.call(
+    document.querySelectorAll('h1, h2, h3, h4, h5, h6, legend, label, [role="heading"]'),
+    function (element) { return [element.tagName.toLowerCase(), text(element)]; });
+var sections = Array.prototype.map.call(
+    document.querySelectorAll("[aria-labelledby]"),
+    function (element) { return element.getAttribute("aria-labelledby"); });
+var automationIds = {};
+Array.prototype.forEach.call(document.querySelectorAll("[data-automation-id]"), function (element) {
+    var automationId = element.getAttribute("data-automation-id");
+    (automationIds[automationId] = automationIds[automationId] || {})[element.tagName.toLowerCase()] = true;
+});
+var controls = Array.prototype.map.call(
+    document.querySelectorAll("input, button, textarea"),
+    function (element) {
+        return {
+            tag: element.tagName.toLowerCase(),
+            type: element.getAttribute("type") || "",
+            automationId: element.getAttribute("data-automation-id") || "",
+            label: labelOf(element),
+            value: element.tagName === "BUTTON" ? text(element) : (element.value || ""),
+            checked: !!element.checked,
+            panel: panelOf(element)
+        };
+    });
+return {url: location.href, headings: headings, sections: sections,
+        automationIds: automationIds, controls: controls};
+"""
+
+# identify_current_page results
+SIGN_IN_PAGE = "登录页面"
+MY_INFORMATION_PAGE = "个人信息页面"
+MY_EXPERIENCE_PAGE = "工作经历页面"
+SELF_IDENTIFY_PAGE = "附加信息页面"
+REVIEW_PAGE = "审核页面"
+CREATE_ACCOUNT_PAGE = "创建账号页面"
+UNKNOWN_PAGE = "未知页面"
+
+
+class PageSnapshot:
+    """Compact JSON snapshot of the current page, existence checks run against it in python"""
+
+    def __init__(self, data):
+        self.url = data.get("url")
+        self.headings = [(tag, text) for tag, text in data.get("headings", [])]
+        self.sections = set(data.get("sections", []))
+        self.automation_ids = data.get("automationIds", {})
+        self.controls = data.get("controls", [])
+
+    @classmethod
+    def take(cls, driver):
+        try:
+            return cls(driver.execute_script(PAGE_SNAPSHOT_SCRIPT) or {})
+        except selenium_exceptions.WebDriverException as e:
+            print(f"[错误] 页面快照失败: {e}")
+            return cls({})
+
+    def has_automation_id(self, automation_id, tag=None):
+        tags = self.automation_ids.get(automation_id, {})
+        return bool(tags) and (tag is None or tag in tags)
+
+    def has_heading(self, text, tags=("h2",)):
+        return any(tag in tags and text in heading for tag, heading in self.headings)
+
+    def has_text(self, text):
+        """same as `//*[contains(text(), text)]` for headings, legends and labels"""
+        return any(text in heading for _, heading in self.headings)
+
+    def has_section(self, labelledby):
+        return labelledby in self.sections
+
+    def count_panels(self, section_prefix):
+        """number of `{section_prefix}-{idx}-panel` containers, e.g. count_panels("Work-Experience")"""
+        pattern = re.compile(rf"^{re.escape(section_prefix)}-(\d+)-panel$")
+        return len({match.group(1) for match in map(pattern.match, self.sections) if match})
+
+    def find_controls(self, label=None, automation_id=None, panel=None):
+        return [control for control in self.controls
+                if (label is None or label in control["label"])
+                and (automation_id is None or control["automationId"] == automation_id)
+                and (panel is None or control["panel"] == panel)]
+
+    def classify(self):
+        """识别当前页面类型"""
+        if self.has_automation_id("signInLink", tag="button"):
+            return SIGN_IN_PAGE
+        # the review page also shows the headings and sections of the pages it summarizes
+        if self.has_heading("Review"):
+            return REVIEW_PAGE
+        if self.has_heading("My Information"):
+            return MY_INFORMATION_PAGE
+        if self.has_section("Work-Experience-section"):
+            return MY_EXPERIENCE_PAGE
+        if self.has_heading("Self Identify"):
+            return SELF_IDENTIFY_PAGE
+        if self.has_automation_id("email", tag="input"):
+            return CREATE_ACCOUNT_PAGE
+        return UNKNOWN_PAGE
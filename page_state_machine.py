@@ -0,0 +1,159 @@
+import time
+
+import selenium.common.exceptions as selenium_exceptions
+
+from page_readiness import LOADING_INDICATOR_SELECTORS, restored_script_timeout
+from page_snapshot import (PageSnapshot,
+                           MY_INFORMATION_PAGE,
+                           MY_EXPERIENCE_PAGE,
+                           SELF_IDENTIFY_PAGE,
+                           REVIEW_PAGE)
+
+# what identifies each page, the same checks as PageSnapshot.classify and in the same order:
+# the review page first, it still shows the headings and sections of the pages it summarizes
+PAGE_SIGNATURES = {
+    REVIEW_PAGE: '//h2[contains(.,"Review")]',
+    MY_INFORMATION_PAGE: '//h2[contains(.,"My Information")]',
+    MY_EXPERIENCE_PAGE: '//*[@aria-labelledby="Work-Experience-section"]',
+    SELF_IDENTIFY_PAGE: '//h2[contains(.,"Self Identify")]',
+}
+# how often a page may be handled before the flow gives up on it
+PAGE_RETRIES = 2
+
+# arguments: [[state, xpath]], loading indicator selectors, timeout in ms
+# answers the first state whose signature is in the page once no loading indicator is shown, null on timeout
+WAIT_FOR_STATE_SCRIPT = """
+var signatures = arguments[0], selectors = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+function busy() {
+    if (document.readyState !== "complete") return true;
+    return selectors.some(function (selector) {
+        return Array.prototype.some.call(document.querySelectorAll(selector), function (element) {
+            return element.getClientRects().length > 0;
+        });
+    });
+}
+function current() {
+    if (busy()) return null;
+    for (var i = 0; i < signatures.length; i++) {
+        if (document.evaluate(signatures[i][1], document, null,
+                              XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) return signatures[i][0];
+    }
+    return null;
+}
+var state = current();
+if (state !== null) return done(state);
+var observer = new MutationObserver(check);
+var expire = setTimeout(finish, timeout, null);
+// readyState changes are not mutations
+var poll = setInterval(check, 100);
+function check() {
+    var state = current();
+    if (state !== null) finish(state);
+}
+function finish(state) {
+    observer.disconnect();
+    clearTimeout(expire);
+    clearInterval(poll);
+    done(state);
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+"""
+
+
+class PageStateMachine:
+    """
+    Drives the application from page to page.
+    Every page type has a handler and the pages expected after it, the machine waits for their signatures
+    directly; only a page none of them matches is classified from a full snapshot.
+    """
+
+    def __init__(self, autofill, retries=PAGE_RETRIES):
+        self.autofill = autofill
+        self.driver = autofill.driver
+        self.readiness = autofill.readiness
+        self.retries = retries
+        # state -> (handler, expected next states, final)
+        self.handlers = {}
+        # how often each state was handled
+        self.visits = {}
+
+    def register(self, state, handler, next_states=(), final=False):
+        """
+        handler: returns whether the page was saved (a final handler: whether the application is complete)
+        next_states: the pages expected once the handler saved the page
+        """
+        self.handlers[state] = (handler, list(next_states), final)
+
+    def wait_for_state(self, states, transition="page_load"):
+        """:return: the first of the states whose signature shows up before the transition timeout, or None"""
+        # checked in the order of PAGE_SIGNATURES whatever the order of the expected states
+        signatures = [[state, xpath] for state, xpath in PAGE_SIGNATURES.items() if state in states]
+        if not signatures:
+            return None
+        timeout = self.readiness.get_timeout(transition)
+        started_at = time.perf_counter()
+        deadline = started_at + timeout
+        state = None
+        with restored_script_timeout(self.driver):
+            while state is None and time.perf_counter() < deadline:
+                remaining = deadline - time.perf_counter()
+                self.driver.set_script_timeout(remaining + 5)
+                try:
+                    state = self.driver.execute_async_script(
+                        WAIT_FOR_STATE_SCRIPT, signatures, LOADING_INDICATOR_SELECTORS, int(remaining * 1000))
+                except selenium_exceptions.WebDriverException:
+                    # the document was replaced while waiting, check the new one
+                    time.sleep(0.05)
+                    continue
+                if state is None:
+                    break
+        self.readiness.record(transition, "state", started_at, state is not None)
+        return state
+
+    def classify(self):
+        """full classification, only for pages that are not where the flow expected to be"""
+        self.readiness.wait_until_ready("page_load")
+        return PageSnapshot.take(self.driver).classify()
+
+    def locate(self, expected, transition):
+        state = self.wait_for_state(expected, transition)
+        if state is None:
+            state = self.classify()
+            print(f"[信息] 页面不是预期的 {', '.join(expected)}, 识别为: {state}")
+        return state
+
+    def run(self):
+        """:return: True once the final page was handled successfully"""
+        expected = list(self.handlers)
+        transition = "page_load"
+        while True:
+            state = self.locate(expected, transition)
+            print(f"[信息] 当前页面类型: {state}")
+            if state not in self.handlers:
+                # 未知页面, 询问用户
+                print(f"[警告] 检测到未知页面类型: {state}")
+                if not self.autofill.handle_manual_operation():
+                    return False
+                expected, transition = list(self.handlers), "page_load"
+                continue
+            self.visits[state] = self.visits.get(state, 0) + 1
+            if self.visits[state] > self.retries + 1:
+                print(f"[警告] {state} 已处理 {self.visits[state] - 1} 次仍未完成")
+                if not self.autofill.handle_manual_operation():
+                    return False
+                self.visits[state] = 0
+                expected, transition = list(self.handlers), "page_load"
+                continue
+            handler, next_states, final = self.handlers[state]
+            with self.autofill.tracer.page(state):
+                result = handler()
+            if final:
+                return bool(result)
+            if result:
+                # Save and Continue already waited for the next page
+                expected, transition = next_states or list(self.handlers), "dom_settle"
+            else:
+                # the page was not saved, most likely still the same one
+                expected, transition = [state] + next_states, "dom_settle"
+
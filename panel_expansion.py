@@ -0,0 +1,64 @@
+import selenium.common.exceptions as selenium_exceptions
+
+from page_readiness import restored_script_timeout
+
+# arguments: add button xpath, panel prefix (e.g. "Work-Experience"), wanted panels, timeout in ms
+# clicks the add button once, waits (MutationObserver) until the new `{prefix}-{idx}-panel` is rendered,
+# then clicks the button again, queried anew: once a panel exists it is the "Add Another" button after it.
+# A click is never repeated while its panel is pending, extra empty panels would block Save with
+# required-field errors. Answers the number of panels in the page.
+EXPAND_PANELS_SCRIPT = """
+var buttonXPath = arguments[0], prefix = arguments[1], wanted = arguments[2], timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+var pattern = new RegExp("^" + prefix.replace(/[.*+?^${}()|[\\]\\\\-]/g, "\\\\$&") + "-\\\\d+-panel$");
+function countPanels() {
+    var labels = {};
+    Array.prototype.forEach.call(document.querySelectorAll("[aria-labelledby]"), function (element) {
+        var label = element.getAttribute("aria-labelledby");
+        if (pattern.test(label)) labels[label] = true;
+    });
+    return Object.keys(labels).length;
+}
+function addButton() {
+    var buttons = document.evaluate(buttonXPath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return buttons.snapshotLength ? buttons.snapshotItem(buttons.snapshotLength - 1) : null;
+}
+// panel count when the button was last clicked, its panel is awaited
+var clickedAt = -1, finished = false;
+var observer = new MutationObserver(next);
+var expire = setTimeout(finish, timeout);
+function next() {
+    var current = countPanels();
+    if (current >= wanted) return finish();
+    if (current === clickedAt) return;
+    var button = addButton();
+    // re-rendered meanwhile, the mutation bringing it back calls next again
+    if (!button) return;
+    clickedAt = current;
+    button.click();
+}
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(expire);
+    done(countPanels());
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+next();
+"""
+
+
+def expand_panels(driver, add_button_xpath, section_prefix, wanted, timeout):
+    """
+    Create the missing `{section_prefix}-{idx}-panel` containers in one WebDriver round trip
+    :return: the number of panels in the page afterwards
+    """
+    try:
+        with restored_script_timeout(driver):
+            driver.set_script_timeout(timeout + 5)
+            return driver.execute_async_script(
+                EXPAND_PANELS_SCRIPT, add_button_xpath, section_prefix, wanted, int(timeout * 1000))
+    except selenium_exceptions.WebDriverException as e:
+        print(f"[WARNING] expanding {section_prefix} panels failed: {e}")
+        return 0
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+
+import yaml
+
+from atomic_file import atomic_write
+
+RESUME_CACHE_DIR = "/tmp/custom/resume-cache"
+# bump when the model changes, older cached models are ignored
+RESUME_MODEL_VERSION = 2
+
+WORK_DATE_PATTERN = re.compile(r"^\d{1,2}/\d{4}$")
+EDUCATION_DATE_PATTERN = re.compile(r"^\d{4}$")
+
+
+class ResumeError(ValueError):
+    """resume.yml does not match the expected schema, lists every problem found"""
+
+    def __init__(self, resume_path, errors):
+        self.errors = errors
+        super().__init__(f"Something went wrong while parsing {resume_path}:\n" +
+                         "\n".join(f" -> {error}" for error in errors))
+
+
+@dataclass(frozen=True, slots=True)
+class Account:
+    email: str
+    password: str
+
+
+@dataclass(frozen=True, slots=True)
+class MyInformation:
+    source: str
+    previous_work: bool
+    country: str
+    first_name: str
+    last_name: str
+    address_line: str
+    city: str
+    state: str
+    zip: str
+    phone_device_type: str
+    phone_code_country: str
+    phone_number: str
+    phone_extension: str
+
+    @property
+    def full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+
+@dataclass(frozen=True, slots=True)
+class Work:
+    job_title: str
+    company: str
+    location: str
+    current_work: bool
+    from_date: str
+    to_date: str
+    description: str
+
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    university: str
+    degree: str
+    field_of_study: str
+    gpa: str
+    from_date: str
+    to_date: str
+
+
+@dataclass(frozen=True, slots=True)
+class Language:
+    language: str
+    fluent: bool
+    comprehension: str
+    overall: str
+    reading: str
+    speaking: str
+    writing: str
+    level: str
+
+
+@dataclass(frozen=True, slots=True)
+class SelfIdentify:
+    language: str
+
+
+@dataclass(frozen=True, slots=True)
+class Resume:
+    account: Account
+    my_information: MyInformation
+    works: tuple
+    educations: tuple
+    languages: tuple
+    websites: tuple
+    resume_file: str
+    self_identify: SelfIdentify
+    # (key, value) pairs, not used by the form filling yet
+    additional_information: tuple
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        # unquoted Yes/No are parsed as booleans by yaml
+        return "Yes" if value else "No"
+    return str(value)
+
+
+class _ResumeParser:
+    def __init__(self, resume_data):
+        self.resume_data = resume_data if isinstance(resume_data, dict) else {}
+        self.errors = []
+
+    def section(self, *keys):
+        data = self.resume_data
+        for key in keys:
+            if not isinstance(data, dict) or not isinstance(data.get(key), dict):
+                self.errors.append(f"missing '{'.'.join(keys)}' section")
+                return {}
+            data = data[key]
+        return data
+
+    def value(self, data, key, where, required=False):
+        value = data.get(key)
+        if required and value in (None, ""):
+            self.errors.append(f"missing '{key}' in {where}")
+        return value
+
+    def date(self, data, key, where, pattern, required=True):
+        value = _text(data.get(key)).strip()
+        if not value and not required:
+            return ""
+        if not pattern.match(value):
+            self.errors.append(f"invalid '{key}' date '{value}' in {where}")
+        return value
+
+    def entries(self, data, key, prefix):
+        """ordered list entries, e.g. `- work1: {...}`, `- work2: {...}`"""
+        entries = []
+        for idx, entry in enumerate(data.get(key) or [], start=1):
+            if not isinstance(entry, dict) or not isinstance(entry.get(f"{prefix}{idx}"), dict):
+                self.errors.append(f"{key} entry {idx} must be '{prefix}{idx}' -> please review the order !")
+                continue
+            entries.append((idx, entry[f"{prefix}{idx}"]))
+        return entries
+
+    def parse(self):
+        account = self.section("account")
+        information = self.section("my-information")
+        experience = self.section("my-experience")
+        self_identify = self.section("self-identify")
+        additional_information = self.resume_data.get("additional-information") or {}
+        if isinstance(additional_information, list):
+            # older resumes: a list of single key mappings
+            additional_information = {key: value for item in additional_information
+                                      if isinstance(item, dict) for key, value in item.items()}
+
+        works = []
+        for idx, work in self.entries(experience, "work-experiences", "work"):
+            where = f"work{idx}"
+            current_work = bool(work.get("current-work"))
+            from_date = self.date(work, "from", where, WORK_DATE_PATTERN)
+            to_date = self.date(work, "to", where, WORK_DATE_PATTERN, required=not current_work)
+            works.append(Work(
+                job_title=_text(self.value(work, "job-title", where, required=True)),
+                company=_text(self.value(work, "company", where, required=True)),
+                location=_text(work.get("location")),
+                current_work=current_work,
+                from_date=from_date,
+                to_date=to_date,
+                description=_text(work.get("description")),
+            ))
+
+        educations = []
+        for idx, education in self.entries(experience, "education-experiences", "education"):
+            where = f"education{idx}"
+            from_date = self.date(education, "from", where, EDUCATION_DATE_PATTERN)
+            to_date = self.date(education, "to", where, EDUCATION_DATE_PATTERN)
+            educations.append(Education(
+                university=_text(self.value(education, "university", where, required=True)),
+                degree=_text(education.get("degree")),
+                field_of_study=_text(education.get("field-of-study")),
+                gpa=_text(education.get("gpa")),
+                from_date=from_date,
+                to_date=to_date,
+            ))
+
+        languages = []
+        for idx, language in self.entries(experience, "languages", "language"):
+            languages.append(Language(
+                language=_text(self.value(language, "language", f"language{idx}", required=True)),
+                fluent=bool(language.get("fluent")),
+                comprehension=_text(language.get("comprehension")),
+                overall=_text(language.get("overall")),
+                reading=_text(language.get("reading")),
+                speaking=_text(language.get("speaking")),
+                writing=_text(language.get("writing")),
+                level=_text(language.get("level")),
+            ))
+
+        resume = Resume(
+            account=Account(
+                email=_text(self.value(account, "email", "account", required=True)),
+                password=_text(self.value(account, "password", "account", required=True)),
+            ),
+            my_information=MyInformation(
+                source=_text(information.get("source")),
+                previous_work=bool(information.get("previous-work")),
+                country=_text(information.get("country")),
+                first_name=_text(self.value(information, "first-name", "my-information", required=True)),
+                last_name=_text(self.value(information, "last-name", "my-information", required=True)),
+                address_line=_text(information.get("address-line")),
+                city=_text(information.get("city")),
+                state=_text(information.get("state")),
+                zip=_text(information.get("zip")),
+                phone_device_type=_text(information.get("phone-device-type")),
+                phone_code_country=_text(information.get("phone-code-country")),
+                phone_number=_text(information.get("phone-number")),
+                phone_extension=_text(information.get("phone-extension")),
+            ),
+            works=tuple(works),
+            educations=tuple(educations),
+            languages=tuple(languages),
+            websites=tuple(_text(website) for website in experience.get("websites") or []),
+            resume_file=_text(experience.get("resume")),
+            self_identify=SelfIdentify(language=_text(self_identify.get("language"))),
+            additional_information=tuple((key, _text(value)) for key, value in additional_information.items()),
+        )
+        return resume
+
+
+def resume_from_dict(data):
+    """the Resume written by dataclasses.asdict, e.g. read from the cache"""
+    return Resume(
+        account=Account(**data["account"]),
+        my_information=MyInformation(**data["my_information"]),
+        works=tuple(Work(**work) for work in data["works"]),
+        educations=tuple(Education(**education) for education in data["educations"]),
+        languages=tuple(Language(**language) for language in data["languages"]),
+        websites=tuple(data["websites"]),
+        resume_file=data["resume_file"],
+        self_identify=SelfIdentify(**data["self_identify"]),
+        additional_information=tuple((key, value) for key, value in data["additional_information"]),
+    )
+
+
+def parse_resume(resume_path):
+    with open(resume_path) as resume_file:
+        try:
+            resume_data = yaml.safe_load(resume_file)
+        except yaml.YAMLError as e:
+            raise ResumeError(resume_path, [str(e)])
+    parser = _ResumeParser(resume_data)
+    resume = parser.parse()
+    if parser.errors:
+        raise ResumeError(resume_path, parser.errors)
+    return resume
+
+
+# resume path -> (mtime, size, Resume) for the current process
+_loaded_resumes = {}
+
+
+def load_resume(resume_path, cache_dir=RESUME_CACHE_DIR):
+    """
+    Parsed and validated resume, cached in memory and on disk until the
+    yaml file changes
+    """
+    resume_path = os.path.abspath(resume_path)
+    stat = os.stat(resume_path)
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded_resumes.get(resume_path)
+    if loaded is not None and loaded[0] == cache_key:
+        return loaded[1]
+
+    # plain JSON, a cache file planted by someone else can at worst hold a wrong resume, never run code
+    cache_path = os.path.join(cache_dir, hashlib.sha1(resume_path.encode()).hexdigest() + ".json")
+    resume = None
+    try:
+        with open(cache_path) as cache_file:
+            cached = json.load(cache_file)
+        if cached["version"] == RESUME_MODEL_VERSION and tuple(cached["key"]) == cache_key:
+            resume = resume_from_dict(cached["resume"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if resume is None:
+        resume = parse_resume(resume_path)
+        with atomic_write(cache_path) as cache_file:
+            json.dump({"version": RESUME_MODEL_VERSION, "key": cache_key, "resume": asdict(resume)},
+                      cache_file, ensure_ascii=False)
+
+    _loaded_resumes[resume_path] = (cache_key, resume)
+    return resume
@@ -0,0 +1,108 @@
+import os
+import re
+
+import selenium.common.exceptions as selenium_exceptions
+from selenium.webdriver.common.by import By
+
+from page_readiness import restored_script_timeout
+
+FILE_INPUT_XPATH = '//input[@data-automation-id="file-upload-input-ref"]'
+DELETE_FILE_XPATH = '//button[@data-automation-id="delete-file"]'
+# Workday shows an uploaded file as a chip, and a progress bar while the upload is running
+FILE_CHIP_SELECTORS = [
+    '[data-automation-id="file-upload-item"]',
+    '[data-automation-id="file-upload-successful"]',
+]
+UPLOAD_PROGRESS_SELECTORS = [
+    '[data-automation-id="file-upload-progress-bar"]',
+    '[data-automation-id="file-upload-drop-zone"] [role="progressbar"]',
+]
+
+SIZE_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*(bytes|b|kb|mb|gb)\b", re.IGNORECASE)
+SIZE_UNITS = {"bytes": 1, "b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3}
+
+# arguments: chip selectors
+# answers the attached files as [{name, text}] (text shows the size on most tenants)
+ATTACHED_FILES_SCRIPT = """
+var chips = document.querySelectorAll(arguments[0].join(","));
+return Array.prototype.map.call(chips, function (chip) {
+    var name = chip.querySelector('[data-automation-id="file-upload-item-name"]');
+    return {name: (name || chip).textContent.trim(), text: chip.textContent.trim()};
+});
+"""
+
+# arguments: file name, chip selectors, progress selectors, timeout in ms
+# answers whether the chip of the file is shown and no progress bar is left before the timeout
+WAIT_FOR_UPLOAD_SCRIPT = """
+var fileName = arguments[0], chipSelectors = arguments[1].join(","), progressSelectors = arguments[2].join(",");
+var timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+var deadline = Date.now() + timeout;
+function uploaded() {
+    if (document.querySelector(progressSelectors)) return false;
+    return Array.prototype.some.call(document.querySelectorAll(chipSelectors), function (chip) {
+        return chip.textContent.indexOf(fileName) !== -1;
+    });
+}
+(function poll() {
+    if (uploaded()) return done(true);
+    if (Date.now() >= deadline) return done(false);
+    setTimeout(poll, 50);
+})();
+"""
+
+
+def parse_size(text):
+    """
+    "resume.pdf 245 KB" -> (250880, 1024), the size and how precise it is
+    :return: None when the text shows no size
+    """
+    match = SIZE_PATTERN.search(text)
+    if not match:
+        return None
+    number, unit = match.group(1).replace(",", "."), SIZE_UNITS[match.group(2).lower()]
+    decimals = len(number.split(".")[1]) if "." in number else 0
+    return float(number) * unit, unit / 10 ** decimals
+
+
+def is_attached(attached_files, file_path):
+    """the same file is already uploaded: a chip with its name showing its size"""
+    file_name = os.path.basename(file_path)
+    file_size = os.path.getsize(file_path)
+    for attached in attached_files:
+        if attached["name"] != file_name and file_name not in attached["text"]:
+            continue
+        size = parse_size(attached["text"])
+        if size is not None and abs(size[0] - file_size) <= size[1]:
+            return True
+    return False
+
+
+def start_upload(driver, file_path):
+    """
+    Hand the file to the upload input and return without waiting for Workday to store it
+    :return: False when the same file was already attached, nothing to wait for
+    """
+    attached_files = driver.execute_script(ATTACHED_FILES_SCRIPT, FILE_CHIP_SELECTORS)
+    if is_attached(attached_files, file_path):
+        return False
+    for delete_button in driver.find_elements(By.XPATH, DELETE_FILE_XPATH):
+        try:
+            delete_button.click()
+        except selenium_exceptions.WebDriverException:
+            pass
+    driver.find_element(By.XPATH, FILE_INPUT_XPATH).send_keys(os.path.abspath(file_path))
+    return True
+
+
+def wait_for_upload(driver, file_path, timeout):
+    """:return: whether Workday shows the uploaded file before the timeout"""
+    try:
+        with restored_script_timeout(driver):
+            driver.set_script_timeout(timeout + 5)
+            return bool(driver.execute_async_script(
+                WAIT_FOR_UPLOAD_SCRIPT, os.path.basename(file_path),
+                FILE_CHIP_SELECTORS, UPLOAD_PROGRESS_SELECTORS, int(timeout * 1000)))
+    except selenium_exceptions.WebDriverException as e:
+        print(f"[WARNING] waiting for the upload of {file_path} failed: {e}")
+        return False
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+import selenium.common.exceptions as selenium_exceptions
+
+from atomic_file import atomic_write
+
+SESSIONS_DIR = "/tmp/custom/workday-sessions"
+# Workday expires idle candidate sessions, don't reuse older ones
+SESSION_TTL = 30 * 60
+
+LOCAL_STORAGE_DUMP_SCRIPT = "return Object.assign({}, window.localStorage);"
+
+# runs before any page script of the next document, so Workday boots with the
+# restored localStorage; only once per tab and only on the tenant host
+LOCAL_STORAGE_RESTORE_SCRIPT = """
+(function (host, items) {
+    try {
+        if (location.host !== host || window.sessionStorage.getItem("__wdSessionRestored")) return;
+        Object.keys(items).forEach(function (key) { window.localStorage.setItem(key, items[key]); });
+        window.sessionStorage.setItem("__wdSessionRestored", "1");
+    } catch (e) {}
+})(%s, %s);
+"""
+
+
+def get_tenant_host(application_link):
+    return urlparse(application_link).netloc.lower()
+
+
+class SessionStore:
+    """On disk cookies/localStorage cache keyed by (tenant host, account email)"""
+
+    def __init__(self, directory=SESSIONS_DIR, ttl=SESSION_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+        self.evict_expired()
+
+    def session_path(self, host, email):
+        key = hashlib.sha1(f"{host}|{email.lower()}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def is_expired(self, session):
+        return time.time() - session.get("saved_at", 0) > self.ttl
+
+    def load(self, host, email):
+        path = self.session_path(host, email)
+        try:
+            with open(path) as session_file:
+                session = json.load(session_file)
+        except (OSError, ValueError):
+            return None
+        if self.is_expired(session):
+            self.invalidate(host, email)
+            return None
+        return session
+
+    def save(self, driver, host, email):
+        session = {
+            "host": host,
+            "email": email,
+            "saved_at": time.time(),
+            "cookies": driver.get_cookies(),
+            "local_storage": driver.execute_script(LOCAL_STORAGE_DUMP_SCRIPT) or {},
+        }
+        # several workers may share the same store
+        with atomic_write(self.session_path(host, email)) as session_file:
+            json.dump(session, session_file)
+        print(f"[INFO] session saved for {email} on {host}")
+
+    def invalidate(self, host, email):
+        try:
+            os.remove(self.session_path(host, email))
+        except FileNotFoundError:
+            pass
+
+    def evict_expired(self):
+        evicted = 0
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path) as session_file:
+                    session = json.load(session_file)
+            except (OSError, ValueError):
+                session = {}
+            if self.is_expired(session):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                evicted += 1
+        return evicted
+
+    def restore(self, driver, application_link, email):
+        """
+        Install the cached cookies and localStorage of the tenant before
+        `driver.get(application_link)`, returns False if there is no valid session
+        """
+        host = get_tenant_host(application_link)
+        session = self.load(host, email)
+        if session is None:
+            return False
+        try:
+            self.restore_with_devtools(driver, session)
+        except (AttributeError, selenium_exceptions.WebDriverException):
+            # browsers without devtools (firefox): cookies can only be set on the tenant origin
+            parsed_link = urlparse(application_link)
+            driver.get(f"{parsed_link.scheme}://{parsed_link.netloc}/")
+            for cookie in session["cookies"]:
+                try:
+                    driver.add_cookie(cookie)
+                except selenium_exceptions.WebDriverException:
+                    continue
+            driver.execute_script(LOCAL_STORAGE_RESTORE_SCRIPT % (
+                json.dumps(session["host"]), json.dumps(session["local_storage"])))
+        print(f"[INFO] session restored for {email} on {host}")
+        return True
+
+    @staticmethod
+    def restore_with_devtools(driver, session):
+        cookies = []
+        for cookie in session["cookies"]:
+            cdp_cookie = {
+                "name": cookie["name"],
+                "value": cookie["value"],
+                "domain": cookie["domain"],
+                "path": cookie.get("path", "/"),
+                "secure": cookie.get("secure", False),
+                "httpOnly": cookie.get("httpOnly", False),
+            }
+            if "expiry" in cookie:
+                cdp_cookie["expires"] = cookie["expiry"]
+            if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+                cdp_cookie["sameSite"] = cookie["sameSite"]
+            cookies.append(cdp_cookie)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+            "source": LOCAL_STORAGE_RESTORE_SCRIPT % (
+                json.dumps(session["host"]), json.dumps(session["local_storage"]))
+        })
@@ -0,0 +1,256 @@
+import time
+
+import selenium.common.exceptions as selenium_exceptions
+
+# dependency kinds, a PageStep runs once all of its dependencies are met
+AFTER_STEP = "after"
+ELEMENT_PRESENT = "present"
+# DOM mutations closer than this are one change (e.g. a panel rendering its fields)
+MUTATION_DEBOUNCE_MS = 50
+
+XPATH_PRESENCE_JS = """
+function presence(xpaths) {
+    var cache = window.__wdXPathCache || (window.__wdXPathCache = {});
+    return xpaths.map(function (xpath) {
+        var expression = cache[xpath] || (cache[xpath] = document.createExpression(xpath, null));
+        return expression.evaluate(document, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+    });
+}
+"""
+
+PRESENCE_SCRIPT = XPATH_PRESENCE_JS + "return presence(arguments[0]);"
+
+# arguments: xpaths, their presence as last seen, timeout in ms
+# answers [mutated, presence] after the first (debounced) DOM mutation or once the timeout expired
+WAIT_FOR_MUTATION_SCRIPT = XPATH_PRESENCE_JS + """
+var xpaths = arguments[0], known = arguments[1], timeout = arguments[2], debounce = %d;
+var done = arguments[arguments.length - 1];
+var current = presence(xpaths);
+if (current.some(function (present, i) { return present !== known[i]; })) return done([true, current]);
+var settle = null;
+var observer = new MutationObserver(function () {
+    clearTimeout(settle);
+    settle = setTimeout(finish, debounce, true);
+});
+var expire = setTimeout(finish, timeout, false);
+function finish(mutated) {
+    observer.disconnect();
+    clearTimeout(settle);
+    clearTimeout(expire);
+    done([mutated, presence(xpaths)]);
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+""" % MUTATION_DEBOUNCE_MS
+
+
+def after(step_name):
+    """run once the step with that name succeeded, e.g. after("work-add-2")"""
+    return AFTER_STEP, step_name
+
+
+def element_present(xpath):
+    """run once the element is in the page, e.g. the panel created by an add button"""
+    return ELEMENT_PRESENT, xpath
+
+
+def depend_on(page_steps, *dependencies):
+    """add the dependencies to every step, :return: the steps"""
+    for page_step in page_steps:
+        page_step.depends_on = list(page_step.depends_on) + list(dependencies)
+    return page_steps
+
+
+def describe_step(page_step):
+    return page_step.name or page_step.options.get("field") or page_step.params[0]
+
+
+class StepScheduler:
+    """
+    Runs the PageSteps of a page as soon as their dependencies are met.
+    Ready text inputs are filled together, steps waiting for the page are retried when the DOM changes
+    instead of polling, and whatever could not be filled is reported at the end.
+    """
+
+    def __init__(self, autofill, idle_timeout=None, retries=2):
+        self.autofill = autofill
+        self.driver = autofill.driver
+        self.tracer = autofill.tracer
+        # how long the page may stay unchanged while steps are still waiting
+        self.idle_timeout = autofill.ELEMENT_WAITING_TIMEOUT if idle_timeout is None else idle_timeout
+        # how often a failed step is tried again after the page changed
+        self.retries = retries
+        # steps skipped because the page already held the resume value
+        self.unchanged = 0
+
+    @staticmethod
+    def has_value(page_step):
+        """fills without a value (e.g. an empty phone extension) have nothing to do"""
+        if page_step.action in ("LOCATE_AND_FILL", "LOCATE_DROPDOWN_AND_FILL"):
+            return bool(page_step.params[1])
+        return True
+
+    @staticmethod
+    def should_retry(page_step):
+        # a step without dependencies ran on a settled page: a missing optional element is simply not there
+        return bool(page_step.depends_on) or bool(page_step.options.get("required"))
+
+    @staticmethod
+    def is_ready(page_step, succeeded, presence):
+        for kind, value in page_step.depends_on:
+            if kind == AFTER_STEP and value not in succeeded:
+                return False
+            if kind == ELEMENT_PRESENT and not presence.get(value):
+                return False
+        return True
+
+    def check_presence(self, xpaths):
+        if not xpaths:
+            return {}
+        return dict(zip(xpaths, self.driver.execute_script(PRESENCE_SCRIPT, xpaths)))
+
+    def wait_for_mutation(self, xpaths, presence, timeout):
+        """:return: (whether the page changed, presence of the xpaths)"""
+        started_at = time.perf_counter()
+        mutated, current = self.driver.execute_async_script(
+            WAIT_FOR_MUTATION_SCRIPT, xpaths, [bool(presence.get(xpath)) for xpath in xpaths], int(timeout * 1000))
+        self.tracer.record_wait("dom_mutation", "mutation", time.perf_counter() - started_at, mutated)
+        return mutated, dict(zip(xpaths, current))
+
+    def execute_step(self, page_step):
+        """:return: (status, error)"""
+        print(page_step.params)
+        with self.tracer.step(page_step) as record:
+            try:
+                status = self.autofill.execute_step(page_step)
+            except RuntimeError as e:
+                # required steps raise when their element is missing, they are retried or raised at the end
+                if not page_step.options.get("required"):
+                    raise
+                record.outcome = "missing"
+                return False, str(e)
+            except selenium_exceptions.StaleElementReferenceException as e:
+                # the page re-rendered the element while we were using it
+                record.outcome = "stale"
+                return False, f"{type(e).__name__}: {e.msg}"
+            record.outcome = "success" if status else "skipped"
+        return bool(status), None
+
+    def execute(self, ready):
+        """
+        run the ready steps in order, consecutive text inputs in a single call
+        :return: list of (page_step, status, error)
+        """
+        results = []
+        # dropdowns already showing the resume value, read in one call
+        unchanged_dropdowns = self.autofill.find_unchanged_dropdowns(ready)
+        for page_step in unchanged_dropdowns:
+            with self.tracer.step(page_step) as record:
+                record.outcome = "unchanged"
+            results.append((page_step, True, None))
+        self.unchanged += len(unchanged_dropdowns)
+        ready = [page_step for page_step in ready if page_step not in unchanged_dropdowns]
+        idx = 0
+        while idx < len(ready):
+            if not self.autofill.is_batchable_fill(ready[idx]):
+                results.append((ready[idx], *self.execute_step(ready[idx])))
+                idx += 1
+                continue
+            end = idx
+            while end < len(ready) and self.autofill.is_batchable_fill(ready[end]):
+                print(ready[end].params)
+                end += 1
+            batch = ready[idx:end]
+            with self.tracer.step(None, action="BATCH_LOCATE_AND_FILL",
+                                  params=[describe_step(page_step) for page_step in batch]) as record:
+                for page_step in batch:
+                    self.tracer.count_execution(page_step)
+                statuses, unchanged = self.autofill.batch_locate_and_fill(batch)
+                record.outcome = f"{sum(statuses) - unchanged}/{len(batch)} filled, {unchanged} unchanged"
+            self.unchanged += unchanged
+            results += [(page_step, status, None) for page_step, status in zip(batch, statuses)]
+            idx = end
+        return results
+
+    def run(self, instructions):
+        """
+        :return: the steps left unfilled
+        raise RuntimeError when a required step is among them
+        """
+        pending = [page_step for page_step in instructions if self.has_value(page_step)]
+        succeeded = set()
+        abandoned = set()
+        unfilled = []
+        errors = {}
+        attempts = {}
+        # steps that failed and wait for the page to change before being tried again
+        waiting = set()
+        presence = None
+        idle_since = time.perf_counter()
+
+        def abandon(page_step):
+            pending.remove(page_step)
+            unfilled.append(page_step)
+            if page_step.name:
+                abandoned.add(page_step.name)
+
+        while pending:
+            # a step whose prerequisite will never run cannot run either
+            for page_step in list(pending):
+                if any(kind == AFTER_STEP and value in abandoned for kind, value in page_step.depends_on):
+                    errors[page_step] = "a step it depends on was not completed"
+                    abandon(page_step)
+            xpaths = sorted({value for page_step in pending
+                             for kind, value in page_step.depends_on if kind == ELEMENT_PRESENT})
+            if presence is None:
+                presence = self.check_presence(xpaths)
+            ready = [page_step for page_step in pending
+                     if page_step not in waiting and self.is_ready(page_step, succeeded, presence)]
+            if ready:
+                # the steps change the page, presence has to be checked again
+                presence = None
+                for page_step, status, error in self.execute(ready):
+                    if status:
+                        pending.remove(page_step)
+                        if page_step.name:
+                            succeeded.add(page_step.name)
+                        idle_since = time.perf_counter()
+                        continue
+                    attempts[page_step] = attempts.get(page_step, 0) + 1
+                    if error:
+                        errors[page_step] = error
+                    if self.should_retry(page_step) and attempts[page_step] <= self.retries:
+                        waiting.add(page_step)
+                    else:
+                        abandon(page_step)
+                continue
+            if not pending:
+                break
+            # nothing can run until the page changes
+            remaining = self.idle_timeout - (time.perf_counter() - idle_since)
+            if remaining <= 0:
+                break
+            mutated, presence = self.wait_for_mutation(xpaths, presence, remaining)
+            if not mutated:
+                break
+            waiting.clear()
+
+        for page_step in list(pending):
+            errors.setdefault(page_step, "its dependencies were never met")
+            abandon(page_step)
+        self.report(unfilled, errors)
+        return unfilled
+
+    def report(self, unfilled, errors):
+        if self.unchanged:
+            print(f"[INFO] {self.unchanged} steps skipped, the page already held the resume value")
+        if not unfilled:
+            return
+        print(f"[WARNING] {len(unfilled)} steps left unfilled:")
+        for page_step in unfilled:
+            reason = errors.get(page_step, "element not found")
+            print(f"    {page_step.action} {describe_step(page_step)}: {reason}")
+        required = [page_step for page_step in unfilled if page_step.options.get("required")]
+        if required:
+            raise RuntimeError("Required steps could not be completed: " + "; ".join(
+                f"{describe_step(page_step)} ({errors.get(page_step, 'element not found')})"
+                for page_step in required))
@@ -0,0 +1,28 @@
+import pytest
+
+from applied_ledger import SUBMITTED_STATUS, AppliedLedger, requisition_id
+
+BASE = "https://acme.wd5.myworkdayjobs.com/en-US/External/job"
+
+
+@pytest.mark.parametrize("link, expected", [
+    (f"{BASE}/Remote/Engineer_JR-1000", "JR-1000"),
+    (f"{BASE}/Remote/Engineer_JR-1000/apply", "JR-1000"),
+    (f"{BASE}/Remote/Engineer_JR-1000/apply/applyManually", "JR-1000"),
+    (f"{BASE}/Remote/Senior-Engineer_R12345_1", "R12345_1"),
+    (f"{BASE}/Remote/Senior-Engineer_R12345_1/apply/applyManually", "R12345_1"),
+    (f"{BASE}/Remote/Senior-Engineer_R12345_2/apply/useMyLastApplication", "R12345_2"),
+    (f"{BASE}/Remote/Senior-Engineer_R12345_1?source=LinkedIn", "R12345_1"),
+])
+def test_requisition_id(link, expected):
+    assert requisition_id(link) == expected
+
+
+def test_postings_sharing_an_id_suffix_are_different_applications(tmp_path):
+    ledger = AppliedLedger(str(tmp_path / "ledger.sqlite3"))
+    try:
+        ledger.record(f"{BASE}/Remote/Senior-Engineer_R12345_1/apply", "me@example.com", SUBMITTED_STATUS)
+        assert ledger.is_submitted(f"{BASE}/Remote/Senior-Engineer_R12345_1/apply/applyManually", "ME@example.com")
+        assert not ledger.is_submitted(f"{BASE}/Remote/Data-Engineer_R99999_1/apply", "me@example.com")
+    finally:
+        ledger.close()
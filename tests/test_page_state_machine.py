@@ -0,0 +1,69 @@
+from page_snapshot import MY_EXPERIENCE_PAGE, MY_INFORMATION_PAGE, REVIEW_PAGE, SELF_IDENTIFY_PAGE, PageSnapshot
+from page_state_machine import PAGE_SIGNATURES, PageStateMachine
+
+# the review page summarizes the other pages: their headings and sections are in it too
+REVIEW_PAGE_XPATHS = {PAGE_SIGNATURES[state] for state in PAGE_SIGNATURES}
+
+
+class FakeDriver:
+    """answers WAIT_FOR_STATE_SCRIPT like the page would: the first signature present"""
+
+    def __init__(self, present):
+        self.present = present
+        # the session default of selenium
+        self.script_timeout = 30
+
+    @property
+    def timeouts(self):
+        return type("Timeouts", (), {"script": self.script_timeout})()
+
+    def set_script_timeout(self, timeout):
+        self.script_timeout = timeout
+
+    def execute_async_script(self, script, signatures, selectors, timeout_ms):
+        for state, xpath in signatures:
+            if xpath in self.present:
+                return state
+        return None
+
+
+class FakeReadiness:
+    def get_timeout(self, transition):
+        return 1
+
+    def record(self, *args):
+        pass
+
+
+class FakeAutofill:
+    def __init__(self, driver):
+        self.driver = driver
+        self.readiness = FakeReadiness()
+
+
+def test_review_page_is_matched_before_the_pages_it_summarizes():
+    assert list(PAGE_SIGNATURES)[0] == REVIEW_PAGE
+    machine = PageStateMachine(FakeAutofill(FakeDriver(REVIEW_PAGE_XPATHS)))
+    # expected states in flow order, as the machine passes them after the experience page
+    assert machine.wait_for_state([MY_INFORMATION_PAGE, MY_EXPERIENCE_PAGE, SELF_IDENTIFY_PAGE,
+                                   REVIEW_PAGE]) == REVIEW_PAGE
+
+
+def test_earlier_page_is_matched_without_review_heading():
+    present = {PAGE_SIGNATURES[MY_EXPERIENCE_PAGE]}
+    machine = PageStateMachine(FakeAutofill(FakeDriver(present)))
+    assert machine.wait_for_state([SELF_IDENTIFY_PAGE, MY_EXPERIENCE_PAGE, REVIEW_PAGE]) == MY_EXPERIENCE_PAGE
+
+
+def test_snapshot_classifies_review_page_first():
+    snapshot = PageSnapshot({
+        "headings": [["h2", "Review"], ["h2", "My Information"], ["h2", "Self Identify"]],
+        "sections": ["Work-Experience-section"],
+    })
+    assert snapshot.classify() == REVIEW_PAGE
+
+
+def test_script_timeout_is_restored_after_the_wait():
+    driver = FakeDriver(set())
+    PageStateMachine(FakeAutofill(driver)).wait_for_state([MY_INFORMATION_PAGE])
+    assert driver.script_timeout == 30
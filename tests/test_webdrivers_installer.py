@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+import webdrivers_installer
+
+
+@pytest.fixture
+def drivers_env(tmp_path, monkeypatch):
+    env_file = tmp_path / "cache" / "web-drivers"
+    monkeypatch.setattr(webdrivers_installer, "DRIVERS_ENV_FILE", str(env_file))
+    return env_file
+
+
+def make_driver(path, mode=0o755):
+    path.write_text("#!/bin/sh\n")
+    os.chmod(path, mode)
+    return str(path)
+
+
+def test_recorded_driver_is_reused(tmp_path, drivers_env):
+    driver = make_driver(tmp_path / "chromedriver")
+    webdrivers_installer.record_driver_path("google-chrome", "120.0.1", driver)
+    assert webdrivers_installer.get_cached_driver_path("google-chrome", "120.0.2") == driver
+    assert webdrivers_installer.get_cached_driver_path("google-chrome", "121.0.0") is None
+
+
+def test_planted_env_file_is_ignored(tmp_path, drivers_env):
+    driver = make_driver(tmp_path / "planted")
+    drivers_env.parent.mkdir()
+    drivers_env.write_text(f"GOOGLE_CHROME_DRIVER_PATH={driver}\nGOOGLE_CHROME_BROWSER_VERSION=120.0.1\n")
+    os.chmod(drivers_env, 0o666)
+    assert webdrivers_installer.get_cached_driver_path("google-chrome", "120.0.1") is None
+
+
+def test_writable_driver_is_not_run(tmp_path, drivers_env):
+    driver = make_driver(tmp_path / "chromedriver", mode=0o777)
+    webdrivers_installer.record_driver_path("google-chrome", "120.0.1", driver)
+    assert webdrivers_installer.get_cached_driver_path("google-chrome", "120.0.1") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="needs root to chown")
+def test_driver_of_another_user_is_not_run(tmp_path, drivers_env):
+    driver = make_driver(tmp_path / "chromedriver")
+    os.chown(driver, 65534, 65534)
+    webdrivers_installer.record_driver_path("google-chrome", "120.0.1", driver)
+    assert webdrivers_installer.get_cached_driver_path("google-chrome", "120.0.1") is None
@@ -0,0 +1,169 @@
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+TRACE_DIR = "/tmp/custom/traces"
+
+
+class StepRecord:
+    """one executed PageStep (or a batch of them)"""
+
+    def __init__(self, action, field, params):
+        self.action = action
+        self.field = field
+        self.params = params
+        self.locator = None
+        self.outcome = None
+        self.retry = 0
+        self.round_trips = 0
+        self.wait_time = 0.0
+        self.page = None
+        self.start = 0.0
+        self.duration = 0.0
+
+    def to_dict(self):
+        return {
+            "type": "step",
+            "page": self.page,
+            "action": self.action,
+            "field": self.field,
+            "locator": self.locator,
+            "outcome": self.outcome,
+            "retry": self.retry,
+            "round_trips": self.round_trips,
+            "wait_time": round(self.wait_time, 4),
+            "start": round(self.start, 4),
+            "duration": round(self.duration, 4),
+        }
+
+
+# tells apart the exports of this process
+_export_numbers = itertools.count(1)
+
+
+class Tracer:
+    """Records the timing of every page, step and readiness wait of one application"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.round_trips = 0
+        self.steps = []
+        self.pages = []
+        self.waits = []
+        self.current_page = None
+        self.current_step = None
+        # PageStep -> number of times it was executed
+        self.executions = {}
+
+    def now(self):
+        return time.perf_counter() - self.started_at
+
+    def install(self, driver):
+        """count WebDriver round trips, elements send their commands through driver.execute too"""
+        execute = driver.execute
+
+        def counting_execute(*args, **kwargs):
+            self.round_trips += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counting_execute
+
+    @contextmanager
+    def page(self, name):
+        page = {"type": "page", "name": name, "start": self.now(), "round_trips": self.round_trips}
+        previous_page, self.current_page = self.current_page, name
+        try:
+            yield page
+        finally:
+            page["duration"] = round(self.now() - page["start"], 4)
+            page["start"] = round(page["start"], 4)
+            page["round_trips"] = self.round_trips - page["round_trips"]
+            self.pages.append(page)
+            self.current_page = previous_page
+
+    @contextmanager
+    def step(self, page_step, action=None, params=None):
+        record = StepRecord(action or page_step.action,
+                            page_step.options.get("field") if page_step else None,
+                            params if params is not None else page_step.params[:1])
+        if page_step is not None:
+            record.retry = self.count_execution(page_step)
+        record.page = self.current_page
+        record.start = self.now()
+        round_trips = self.round_trips
+        previous_step, self.current_step = self.current_step, record
+        try:
+            yield record
+        except Exception:
+            record.outcome = "error"
+            raise
+        finally:
+            record.duration = self.now() - record.start
+            record.round_trips = self.round_trips - round_trips
+            self.steps.append(record)
+            self.current_step = previous_step
+
+    def last_page(self):
+        """name of the last page handled, None before the first one"""
+        return self.pages[-1]["name"] if self.pages else None
+
+    def count_execution(self, page_step):
+        """:return: how many times the step was executed before"""
+        executions = self.executions.get(page_step, 0)
+        self.executions[page_step] = executions + 1
+        return executions
+
+    def note_locator(self, locator):
+        if self.current_step is not None:
+            self.current_step.locator = locator
+
+    def record_wait(self, name, kind, elapsed, succeeded):
+        self.waits.append({
+            "type": "wait", "page": self.current_page, "name": name, "kind": kind,
+            "start": round(self.now() - elapsed, 4), "duration": round(elapsed, 4), "succeeded": succeeded,
+        })
+        if self.current_step is not None:
+            self.current_step.wait_time += elapsed
+
+    def export_jsonl(self, path):
+        with open(path, "w") as trace_file:
+            for record in self.pages + [step.to_dict() for step in self.steps] + self.waits:
+                trace_file.write(json.dumps(record) + "\n")
+
+    def export_chrome_trace(self, path):
+        """trace-event format, open it in chrome://tracing or ui.perfetto.dev"""
+        events = []
+        for page in self.pages:
+            events.append({"name": page["name"], "cat": "page", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": page["start"] * 1e6, "dur": page["duration"] * 1e6,
+                           "args": {"round_trips": page["round_trips"]}})
+        for step in self.steps:
+            events.append({"name": step.field or step.action, "cat": "step", "ph": "X", "pid": 1, "tid": 2,
+                           "ts": step.start * 1e6, "dur": step.duration * 1e6, "args": step.to_dict()})
+        for wait in self.waits:
+            events.append({"name": f"{wait['kind']}:{wait['name']}", "cat": "wait", "ph": "X", "pid": 1,
+                           "tid": 3, "ts": wait["start"] * 1e6, "dur": wait["duration"] * 1e6,
+                           "args": {"succeeded": wait["succeeded"]}})
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+    def export(self, name, directory=TRACE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        # tabs and workers exporting for the same tenant in the same second get different names
+        base_path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                                            f"{next(_export_numbers)}-{name}")
+        self.export_jsonl(f"{base_path}.jsonl")
+        self.export_chrome_trace(f"{base_path}.trace.json")
+        return base_path
+
+    def print_summary(self, slowest=10):
+        print(f"[INFO] trace: {self.now():.2f}s, {self.round_trips} WebDriver round trips")
+        for page in self.pages:
+            print(f"    page {page['name']:<24} {page['duration']:7.2f}s {page['round_trips']:5d} round trips")
+        print(f"[INFO] {slowest} slowest steps")
+        for step in sorted(self.steps, key=lambda step: step.duration, reverse=True)[:slowest]:
+            print(f"    {step.duration:7.2f}s {step.action:<26} {step.field or '':<24} "
+                  f"{step.outcome} retry={step.retry} round_trips={step.round_trips} "
+                  f"wait={step.wait_time:.2f}s {step.locator or step.params}")
@@ -1,5 +1,6 @@
 from datetime import datetime
-from selenium.webdriver import Keys
+
+from date_entry import date_to_numpad_keys
 
 
 def str2bool(v):
@@ -26,41 +27,13 @@ def check_element_text_is_empty(element):
 
 
 def convert_strdate_to_numbpad_keys(str_date):
-    keys_list = []
-    for element in str_date:
-        try:
-            number = int(element)
-            if number == 0:
-                keys_list.append(Keys.NUMPAD0)
-            elif number == 1:
-                keys_list.append(Keys.NUMPAD1)
-            elif number == 2:
-                keys_list.append(Keys.NUMPAD2)
-            elif number == 3:
-                keys_list.append(Keys.NUMPAD3)
-            elif number == 4:
-                keys_list.append(Keys.NUMPAD4)
-            elif number == 5:
-                keys_list.append(Keys.NUMPAD5)
-            elif number == 6:
-                keys_list.append(Keys.NUMPAD6)
-            elif number == 7:
-                keys_list.append(Keys.NUMPAD7)
-            elif number == 8:
-                keys_list.append(Keys.NUMPAD8)
-            elif number == 9:
-                keys_list.append(Keys.NUMPAD9)
-        except ValueError:
-            continue
+    return date_to_numpad_keys(str_date)
+
 
-    return keys_list
+def today_date():
+    """MM/DD/YYYY, as the self identify date widget expects it"""
+    return datetime.now().strftime("%m/%d/%Y")
 
 
 def today_date_in_keys():
-    today_date = datetime.now().date()
-    date_str = (str(today_date.month) +
-                "/" +
-                str(today_date.day) +
-                "/" +
-                str(today_date.year))
-    return convert_strdate_to_numbpad_keys(date_str)
+    return date_to_numpad_keys(today_date())
@@ -1,40 +1,141 @@
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
-from webdriver_manager.firefox import GeckoDriverManager
-
-DRIVERS_ENV_FILE = "/tmp/custom/web-drivers"
-
-
-def install_web_driver(requested_browser="firefox"):
-    webdriver_installers = {
-        "chrome": ChromeDriverManager(
-            chrome_type=ChromeType.CHROMIUM
-        ).install,
-        "firefox": GeckoDriverManager().install,
-    }
-    path = None
-
-    for webdriver_name in webdriver_installers.keys():
-        if webdriver_name == requested_browser.lower():
-            try:
-                print(
-                    f"[INFO] Installing {webdriver_name} web driver"
-                )
-                path = webdriver_installers[webdriver_name]()
-                print(f"[INFO] {webdriver_name} web driver successfully"
-                      " installed!")
-
-            except Exception as e:
-                raise RuntimeError(
-                    "[ERROR] Something went wrong "
-                    "while installing {} web driver due"
-                    " to the following exception {}".format(webdriver_name, e)
-                )
-    if path is None:
+import os
+
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+from atomic_file import atomic_write
+
+# per user: the driver path read from this file is executed
+DRIVERS_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                 "workday-application-automation")
+DRIVERS_ENV_FILE = os.path.join(DRIVERS_CACHE_DIR, "web-drivers")
+
+
+def get_browser_type(requested_browser, chrome_type=ChromeType.CHROMIUM):
+    if requested_browser.lower() == "chrome":
+        return chrome_type
+    return requested_browser.lower()
+
+
+def get_env_prefix(browser_type):
+    return browser_type.upper().replace("-", "_")
+
+
+def get_browser_version(browser_type):
+    """installed browser version, read from the system only (no network)"""
+    try:
+        return OperationSystemManager().get_browser_version_from_os(browser_type)
+    except Exception:
+        return None
+
+
+def get_major_version(version):
+    if not version:
+        return None
+    return version.split(".")[0]
+
+
+def is_trusted_file(path):
+    """owned by the current user and writable by nobody else, a file anyone could have planted is not run"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        return False
+    return not stat.st_mode & 0o022
+
+
+def read_drivers_env():
+    drivers_env = {}
+    if not is_trusted_file(DRIVERS_ENV_FILE):
+        return drivers_env
+    try:
+        with open(DRIVERS_ENV_FILE) as env_file:
+            for line in env_file:
+                if "=" in line:
+                    key, value = line.strip().split("=", 1)
+                    drivers_env[key] = value
+    except OSError:
+        pass
+    return drivers_env
+
+
+def write_drivers_env(drivers_env):
+    os.makedirs(os.path.dirname(DRIVERS_ENV_FILE), mode=0o700, exist_ok=True)
+    with atomic_write(DRIVERS_ENV_FILE) as env_file:
+        for key, value in sorted(drivers_env.items()):
+            env_file.write(f"{key}={value}\n")
+
+
+def get_cached_driver_path(browser_type, browser_version):
+    drivers_env = read_drivers_env()
+    prefix = get_env_prefix(browser_type)
+    path = drivers_env.get(f"{prefix}_DRIVER_PATH")
+    if not path or not os.path.isfile(path) or not is_trusted_file(path):
+        return None
+    cached_major = get_major_version(drivers_env.get(f"{prefix}_BROWSER_VERSION"))
+    current_major = get_major_version(browser_version)
+    # the browser version cannot be read (offline / unusual install): trust the cache
+    if current_major is not None and cached_major != current_major:
+        return None
+    return path
+
+
+def record_driver_path(browser_type, browser_version, path):
+    drivers_env = read_drivers_env()
+    prefix = get_env_prefix(browser_type)
+    drivers_env[f"{prefix}_DRIVER_PATH"] = path
+    drivers_env[f"{prefix}_BROWSER_VERSION"] = browser_version or ""
+    write_drivers_env(drivers_env)
+
+
+def install_web_driver(requested_browser="firefox", chrome_type=ChromeType.CHROMIUM):
+    # only the requested manager is built, each one checks versions on creation
+    if requested_browser.lower() == "chrome":
+        def webdriver_installer():
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager(chrome_type=chrome_type).install()
+    elif requested_browser.lower() == "firefox":
+        def webdriver_installer():
+            from webdriver_manager.firefox import GeckoDriverManager
+            return GeckoDriverManager().install()
+    else:
         raise RuntimeError(
             "[ERROR] Bad browser name "
             "please check the argument browser name passed to this function"
-            "and check if the related installer is mentioned in 'webdriver_installers' dictionary"
+            "and check if the related installer is mentioned in 'install_web_driver'"
         )
 
+    webdriver_name = requested_browser.lower()
+    try:
+        print(
+            f"[INFO] Installing {webdriver_name} web driver"
+        )
+        path = webdriver_installer()
+        print(f"[INFO] {webdriver_name} web driver successfully"
+              " installed!")
+
+    except Exception as e:
+        raise RuntimeError(
+            "[ERROR] Something went wrong "
+            "while installing {} web driver due"
+            " to the following exception {}".format(webdriver_name, e)
+        )
+
+    return path
+
+
+def get_web_driver_path(requested_browser="firefox", chrome_type=ChromeType.CHROMIUM, refresh=False):
+    """
+    Return the cached web driver path when it matches the installed browser
+    major version, install (and cache) it otherwise
+    """
+    browser_type = get_browser_type(requested_browser, chrome_type)
+    browser_version = get_browser_version(browser_type)
+    if not refresh:
+        path = get_cached_driver_path(browser_type, browser_version)
+        if path:
+            return path
+    path = install_web_driver(requested_browser=requested_browser, chrome_type=chrome_type)
+    record_driver_path(browser_type, browser_version, path)
     return path